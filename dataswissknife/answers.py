@@ -0,0 +1,233 @@
+"""
+Module Answers
+==============
+This module lets DSK run unattended. The answers to the questions DSK asks
+are read from a .json or .yaml answers file instead of the prompt.
+
+An answers file looks like this(every key is optional; questions that are
+not answered take the tool's default answer):
+
+    {
+        "project_dir": "/home/me/projects",
+        "root_name": "titanic",
+        "storage_format": "parquet",
+        "compression": "snappy",
+        "dataset": "/home/me/data/titanic.csv",
+        "dataset_name": "titanic",
+        "optimize_memory": true,
+        "n_jobs": 8,
+        "parallel_backend": "process",
+        "cleaning_plan": "/home/me/projects/old/reports/titanic_cleaning_plan.json",
+        "missing": ["drop_columns", "impute"],
+        "imputation": {"age": "median", "embarked": "mode",
+                       "cabin": {"custom": "unknown"}},
+        "consistency": {"fare": "strip"},           # or "auto"
+        "target": "survived",
+        "drop_features": ["name"],
+        "max_categories": 50,
+        "hash_features": ["sku"],
+        "hash_buckets": 1024,
+        "ordinal": {"pclass": ["3", "2", "1"]},
+        "intervals": {"age_band": "-"},
+        "remove_outliers": ["fare"],
+        "outlier_method": "iqr",                    # or "mad", "zscore"
+        "scale": true,
+        "continue_preprocessing": true,
+        "continue_visualization": false,
+        "continue_modelling": true,
+        "model": "random forest"
+    }
+"""
+
+import json
+import os
+
+
+class Answers:
+    """
+    Answers to the questions asked by DSK
+
+    Attributes:
+        spec (dict): The answers, by question
+        interactive (bool): Ask at the prompt whatever the answers do not
+                            cover
+    """
+
+    def __init__(self, spec=None, interactive=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            spec (dict): The answers, by question (Default: no answers)
+            interactive (bool): Ask at the prompt whatever the answers do not
+                                cover (Default: only if there are no answers)
+        """
+
+        self.spec = spec or {}
+        if(interactive is None):
+            interactive = (spec is None)
+        self.interactive = interactive
+        self.__asked = {}   # times a repeated question has been asked
+
+    @classmethod
+    def from_file(cls, path, interactive=False):
+        """
+        Read the answers from a .json or .yaml file
+
+        Parameters:
+            path (str): Path of the answers file
+            interactive (bool): Ask at the prompt whatever the file does not
+                                cover (Default: False)
+
+        Returns:
+            Answers: The answers in the file
+        """
+
+        with open(path) as file:
+            if(os.path.splitext(path)[1].lower() in ('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError("Reading .yaml answers files needs "
+                                      "PyYAML. Install it with 'pip install "
+                                      "pyyaml' or use a .json file.")
+                spec = yaml.safe_load(file)
+            else:
+                spec = json.load(file)
+
+        return (cls(spec or {}, interactive))
+
+    def get(self, *keys):
+        """
+        Look an answer up
+
+        Parameters:
+            keys (str): Key of the answer, one level of nesting per key
+
+        Returns:
+            The answer, or None if there is none
+        """
+
+        value = self.spec
+        for key in keys:
+            if(not isinstance(value, dict) or (key not in value)):
+                return None
+            value = value[key]
+        return value
+
+    def require(self, *keys):
+        """
+        Look up an answer the tool cannot go on without
+
+        Parameters:
+            keys (str): Key of the answer, one level of nesting per key
+
+        Returns:
+            The answer, or None if it can still be asked at the prompt
+        """
+
+        value = self.get(*keys)
+        if((value is None) and (not self.interactive)):
+            raise ValueError("The answers file has no answer for '" +
+                             '.'.join(keys) + "'")
+        return value
+
+    def format(self, value, choices=None):
+        """
+        Turn an answer into what the prompt would have read
+
+        Parameters:
+            value: The answer
+            choices (dict): Menu option for each answer (Default: None)
+
+        Returns:
+            str: The answer as typed at the prompt
+        """
+
+        if(isinstance(value, bool)):
+            value = 'y' if value else 'n'
+        elif(isinstance(value, dict)):
+            value = next(iter(value), '')   # e.g. {"custom": 0} is 'custom'
+        elif(isinstance(value, (list, tuple))):
+            value = ','.join(str(v) for v in value)
+        value = str(value)
+        if(choices is not None):
+            value = choices.get(value.lower(), value)
+        return value
+
+    def ask(self, prompt, *keys, default='', choices=None, repeat=None):
+        """
+        Answer a question from the answers, or at the prompt
+
+        Parameters:
+            prompt (str): The question as displayed at the prompt
+            keys (str): Key of the answer, one level of nesting per key
+            default (str): Answer when running unattended and the answers do
+                           not cover the question; None if the question must
+                           be answered (Default: '', the prompt's default)
+            choices (dict): Menu option for each answer (Default: None)
+            repeat (str): For a question that is asked until this answer is
+                          given; the answers then hold the list of answers to
+                          give before it (Default: None)
+
+        Returns:
+            str: The answer
+        """
+
+        value = self.get(*keys) if len(keys)!=0 else None
+
+        if(repeat is not None):
+            asked = self.__asked.get(keys, 0)
+            self.__asked[keys] = asked + 1
+            if(value is None):
+                value = [] if self.interactive else [default]
+            elif(not isinstance(value, (list, tuple))):
+                value = [value]
+            if(asked < len(value)):
+                value = value[asked]
+            elif(self.interactive):
+                value = None
+            else:
+                value = repeat
+
+        if(value is not None):
+            answer = self.format(value, choices)
+            print(prompt + answer)
+            return answer
+
+        if(self.interactive):
+            return input(prompt)
+
+        if(default is None):
+            raise ValueError("The answers file has no answer for '" +
+                             '.'.join(keys) + "'")
+        print(prompt + default)
+        return default
+
+    def ask_yes_no(self, prompt, key, item=None, default=''):
+        """
+        Answer a yes/no question, either from a single answer or by whether
+        an item is listed in the answers
+
+        Parameters:
+            prompt (str): The question as displayed at the prompt
+            key (str): Key of the answer
+            item (str): The item the question is about, e.g. a feature
+                        (Default: None)
+            default (str): Answer when running unattended and the answers do
+                           not cover the question (Default: '')
+
+        Returns:
+            str: 'y' or 'n', or whatever was typed at the prompt
+        """
+
+        value = self.get(key)
+        if((value is not None) and (item is not None) and
+           (not isinstance(value, bool))):
+            value = item in value
+        if(value is None):
+            return (self.ask(prompt, default=default))
+
+        answer = 'y' if value else 'n'
+        print(prompt + answer)
+        return answer
@@ -0,0 +1,210 @@
+"""
+Module Batch Runner
+===================
+This module runs DSK over many datasets at once. Every dataset gets its own
+project tree, named after the dataset, and is taken through the same
+answers file in a pool of worker processes.
+
+    dsk --batch data/extracts --answers answers.json --workers 4
+
+The datasets are either the .csv files of a directory or listed in a
+manifest(a text file with the path of one dataset per line). The log of
+every project is written next to its tree, and the status and timing of all
+of them are collected into one summary table.
+"""
+
+import os
+import time
+import traceback
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def find_datasets(source):
+    """
+    List the datasets of a batch
+
+    Parameters:
+        source (str): A directory of .csv files, or a manifest with the path
+                      of one dataset per line(blank lines and lines starting
+                      with # are skipped)
+
+    Returns:
+        list: Paths of the datasets
+    """
+
+    if(os.path.isdir(source)):
+        return (sorted(os.path.join(source, f) for f in os.listdir(source)
+                       if f.lower().endswith('.csv')))
+
+    # relative paths in a manifest are relative to the manifest
+    base = os.path.dirname(os.path.abspath(source))
+    datasets = []
+    with open(source) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if((line=='') or line.startswith('#')):
+                continue
+            datasets.append(os.path.join(base, os.path.expanduser(line)))
+    return datasets
+
+
+def project_names(datasets):
+    """
+    Name the project of every dataset after its file, numbering repeated
+    names
+
+    Parameters:
+        datasets (list): Paths of the datasets
+
+    Returns:
+        list: Project names, in the order of the datasets
+    """
+
+    names = []
+    seen = {}
+    for path in datasets:
+        name = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+        seen[name] = seen.get(name, 0) + 1
+        if(seen[name] > 1):
+            name = name + "_" + str(seen[name])
+        names.append(name)
+    return names
+
+
+def run_project(dataset, name, spec, dest_dir):
+    """
+    Take one dataset through DSK in its own project tree; this runs in a
+    worker process
+
+    Parameters:
+        dataset (str): Path of the dataset
+        name (str): Name of the project root and of the dataset
+        spec (dict): Answers shared by all the datasets
+        dest_dir (str): Directory the project tree is created in
+
+    Returns:
+        dict: Row of the summary table; its status is 'done' when the run
+              went as far as the answers asked, else 'failed'
+    """
+
+    from dataswissknife import main_code
+    from dataswissknife.answers import Answers
+
+    spec = dict(spec, project_dir=dest_dir, root_name=name, dataset=dataset,
+                dataset_name=name)
+    log_path = os.path.join(dest_dir, name + ".log")
+    status = 'done'
+    error = ''
+
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            try:
+                main_code.initiate_tool(Answers(spec, interactive=False))
+            except SystemExit as e:
+                # the tool exits when the answers stop it early, which
+                # finishes the run, or when the dataset cannot be processed
+                if(e.code not in (None, main_code.EXIT_STOPPED)):
+                    status = 'failed'
+                    error = ("Exited with code " + str(e.code) + "; see " +
+                             os.path.basename(log_path))
+            except Exception as e:
+                status = 'failed'
+                error = type(e).__name__ + ": " + str(e)
+                traceback.print_exc()
+    seconds = time.perf_counter() - start
+
+    return {
+        'Dataset': os.path.basename(dataset),
+        'Project': os.path.join(dest_dir, name),
+        'Status': status,
+        'Time (s)': seconds,
+        'Error': error,
+    }
+
+
+class BatchRunner:
+    """
+    Runs DSK over many datasets in parallel worker processes
+
+    Attributes:
+        datasets (list): Paths of the datasets
+        spec (dict): Answers shared by all the datasets
+        dest_dir (str): Directory the project trees are created in
+        max_workers (int): Number of worker processes
+    """
+
+    def __init__(self, datasets, spec, dest_dir, max_workers=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            datasets (list): Paths of the datasets
+            spec (dict): Answers shared by all the datasets; the project
+                         directory, root name and dataset are filled in for
+                         every dataset
+            dest_dir (str): Directory the project trees are created in
+            max_workers (int): Number of worker processes
+                               (Default: one per CPU)
+        """
+
+        self.datasets = list(datasets)
+        self.spec = dict(spec)
+        self.dest_dir = os.path.abspath(dest_dir)
+        self.max_workers = max_workers
+
+    def run(self, verbose=True):
+        """
+        Run every dataset and collect the results
+
+        Parameters:
+            verbose (bool): Display progress and the summary table
+                            (Default: True)
+
+        Returns:
+            pandas dataframe: Status and timing of every dataset
+        """
+
+        import pandas as pd
+
+        os.makedirs(self.dest_dir, exist_ok=True)
+        names = project_names(self.datasets)
+        rows = []
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(run_project, dataset, name, self.spec,
+                                   self.dest_dir): dataset
+                       for dataset, name in zip(self.datasets, names)}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    row = future.result()
+                except Exception as e:  # the worker process itself died
+                    row = {'Dataset': os.path.basename(futures[future]),
+                           'Project': '', 'Status': 'failed', 'Time (s)': 0,
+                           'Error': type(e).__name__ + ": " + str(e)}
+                rows.append(row)
+                if(verbose):
+                    print("[" + str(done) + "/" + str(len(futures)) + "]",
+                          row['Dataset'], row['Status'])
+        seconds = time.perf_counter() - start
+
+        summary = pd.DataFrame(rows, columns=['Dataset', 'Project', 'Status',
+                                              'Time (s)', 'Error'])
+        summary = summary.sort_values('Dataset').reset_index(drop=True)
+        summary.to_csv(os.path.join(self.dest_dir, "batch_summary.csv"),
+                       index=False)
+
+        if(verbose):
+            print()
+            print("Batch summary =>")
+            print(summary.to_markdown(index=False))
+            print()
+            print(str((summary['Status']=='done').sum()) + " of " +
+                  str(summary.shape[0]) + " datasets done, " +
+                  str((summary['Status']=='failed').sum()) + " failed, in " +
+                  "{:.1f} s".format(seconds))
+            print("Logs and summary stored at", self.dest_dir)
+
+        return summary
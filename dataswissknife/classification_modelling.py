@@ -6,44 +6,23 @@ This module is concerned with classification tasks in machine learning
 
 import pandas as pd
 
-# eval metrics
-from sklearn.metrics import accuracy_score
-from sklearn.metrics import precision_score
-from sklearn.metrics import recall_score
-from sklearn.metrics import f1_score
-from sklearn.metrics import roc_auc_score
-
-# modelling
-from sklearn import linear_model, tree, ensemble, neighbors, svm
-from sklearn.model_selection import KFold
-from sklearn.model_selection import StratifiedKFold
-from sklearn.model_selection import cross_validate
+# sklearn is imported inside the methods that need it; importing its model
+# zoo takes seconds and is only worth it once modelling actually starts
 
 from colorama import Fore, Back, Style, init
 from termcolor import colored
 init()
 
+from dataswissknife.answers import Answers
+from dataswissknife import encode_data as ed
+
 
 class Baseline:
     """
     Performances of sklearn classifiers with default arguments
     """
     
-    # baseline models
-    baseline_models = {
-        "logistic regression":
-            linear_model.LogisticRegression(random_state=42),
-        "decision tree":
-            tree.DecisionTreeClassifier(random_state=42),
-        "random forest":
-            ensemble.RandomForestClassifier(random_state=42),
-        "k nearest neighbours":
-            neighbors.KNeighborsClassifier(),
-        "support vector machine":
-            svm.SVC(random_state=42),
-        "gradient boosting classifier":
-            ensemble.GradientBoostingClassifier(random_state=42)
-    }
+    baseline_models = None   # baseline models, by name
         
     X_tr = None          # Train descriptors
     y_tr = None          # Train target
@@ -53,33 +32,73 @@ class Baseline:
     SEED = 42            # seed value for cross validation
     
     model_df = None      # dataframe with model informations post training
-    model_names = []
-    acc = []
-    f1 = []
-    prec = []
-    rec = []
-    fit_times = []
-    score_times = []
-    estimators = []      # model estimators
                 
     
-    def __init__(self, X_train, y_train, X_test, y_test):
+    def __init__(self, X_train, y_train, X_test, y_test, answers=None):
         """
         Constructor for the class
         
         Parameters:
             X_train: Train dataset descriptors
             y_train: Train dataset target
+            answers (Answers): Answers to the questions asked while modelling
+                               (Default: ask everything at the prompt)
         """
         
+        self.answers = answers or Answers()
         self.X_tr= X_train
         self.y_tr = y_train
         self.X_te= X_test
         self.y_te = y_test
+        # subset test to the features that train knows about
+        self.equate_test_to_train()
+        # sparse one-hot features are handed to the models as csr matrices
+        if(ed.has_sparse(self.X_tr)):
+            self.X_tr = ed.to_csr(self.X_tr)
+            self.X_te = ed.to_csr(self.X_te)
+        # results belong to the instance, so that baselines can run side by
+        # side in one process
+        self.model_names = []
+        self.acc = []
+        self.f1 = []
+        self.prec = []
+        self.rec = []
+        self.fit_times = []
+        self.score_times = []
+        self.estimators = []      # model estimators
+        self.baseline_models = self.make_baseline_models()
+        
+    def make_baseline_models(self):
+        """
+        Build the baseline models
+        
+        Returns:
+            dict: sklearn classifiers with default arguments, by name
+        """
+        
+        from sklearn import linear_model, tree, ensemble, neighbors, svm
+        
+        return {
+            "logistic regression":
+                linear_model.LogisticRegression(random_state=42),
+            "decision tree":
+                tree.DecisionTreeClassifier(random_state=42),
+            "random forest":
+                ensemble.RandomForestClassifier(random_state=42),
+            "k nearest neighbours":
+                neighbors.KNeighborsClassifier(),
+            "support vector machine":
+                svm.SVC(random_state=42),
+            "gradient boosting classifier":
+                ensemble.GradientBoostingClassifier(random_state=42)
+        }
         
     def train_it(self):
         """Train the algorithms"""
         
+        from sklearn.model_selection import StratifiedKFold
+        from sklearn.model_selection import cross_validate
+        
         # cross validation folds
         cv_folds = 10
         
@@ -126,12 +145,17 @@ class Baseline:
         Choose the model
         """
         
-        ind = int(input("Enter the index of the model that you prefer to "
-                        "use on the test data:"))
-        model = self.estimators[ind]
+        from sklearn.metrics import accuracy_score
         
-        # subset test to the features that train knows about
-        self.equate_test_to_train()
+        # the answers may name the model or give its index; unattended, the
+        # most accurate model is chosen
+        names = {name.lower(): str(i) for i, name in
+                 enumerate(self.model_names)}
+        best = str(self.model_df['Accuracy'].idxmax())
+        ind = int(self.answers.ask("Enter the index of the model that you "
+                                   "prefer to use on the test data:", 'model',
+                                   default=best, choices=names))
+        model = self.estimators[ind]
         
         preds = model.predict(self.X_te)
         acc_score = accuracy_score(self.y_te, preds)
@@ -6,20 +6,41 @@ interaction
 """
 
 import pandas as pd
+import numpy as np
+import os
 import sys
-import itertools
 import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from colorama import Fore, Back, Style, init
 from termcolor import colored
 init()
 
+from dataswissknife.answers import Answers
+from dataswissknife.column_profile import ColumnProfile
+from dataswissknife import dedupe_data as dd
+
+# characters stripped from a value before checking whether it is a number:
+# currency symbols, percent signs, thousands separators and spaces
+NUMERIC_NOISE = r'[\s$€£¥₹%,]'
+NUMERIC_SAMPLE_SIZE = 10000  # values parsed to detect numeric-like features
+NUMERIC_THRESHOLD = 0.95     # share of them that has to parse as a number
+TEXT_DTYPES = ['object', 'string', 'category']  # dtypes that can hold text
+
 class Initiator:
     """
     Initiates the data cleaning operation by loading data
     
     Attributes:
         dataframe (pandas dataframe): The dataframe to be cleaned
+        answers (Answers): Answers to the questions asked while cleaning
+        profile (ColumnProfile): Statistics of the features of the dataframe
+        plan (CleaningPlan): Record of the transformations made
+        n_jobs (int): Number of workers column-wise operations are spread
+                      over
+        backend (str): Kind of workers, 'thread' or 'process'
     """
     
     df = None     # the dataframe       
@@ -35,6 +56,11 @@ class Initiator:
         """
         
         self.df = dataframe
+        self.answers = Answers()   # everything is asked at the prompt
+        self.profile = ColumnProfile(dataframe)
+        self.plan = CleaningPlan()
+        self.n_jobs = 1
+        self.backend = 'thread'
            
     def init_rows_cols(self):
         """Initialises rows and columns"""
@@ -72,7 +98,11 @@ class ColumnCleaner(Initiator):
         for c in (self.df.columns):
             new_col_list.append(c.replace(" ","_").lower().replace("\n","_").
                                 strip())
+        self.plan.record('rename', {old: new for old, new in
+                                    zip(self.df.columns, new_col_list)
+                                    if old!=new})
         self.df.columns = new_col_list
+        self.profile.invalidate()
 
     def cardinality(self, feature):
         """
@@ -85,15 +115,13 @@ class ColumnCleaner(Initiator):
             int: The cardinality of the feature in the dataframe
         """
 
-        return (len(self.df[feature].unique()))
+        return (self.profile.bind(self.df).cardinality(feature))
     
     def rem_const_cols(self):
         """Remove columns with a single constant value"""
 
-        const_cols = []
-        for c in (self.df.columns):
-          if(self.cardinality(c) == 1):
-            const_cols.append(c)
+        const_cols = self.profile.bind(self.df).constant_features()
+        self.plan.record('drop_columns', const_cols)
 
         self.df = self.df.drop(const_cols, axis=1)
 
@@ -108,19 +136,25 @@ class ColumnCleaner(Initiator):
             bool: True if column is empty, else False
         """
         
-        return ((self.df[feature].isna().sum()) == self.num_rows)
+        return (self.profile.bind(self.df).nulls(feature) == self.num_rows)
 
     def rem_empty_cols(self):
         """Removes columns with only NaNs"""
 
-        self.df = self.df.dropna(axis=1, how='all')
+        empty = self.df.columns[self.df.isna().all()]
+        self.plan.record('drop_columns', list(empty))
+        self.df = self.df.drop(empty, axis=1)
 
     def round_float_cols(self):
       """Rounds elements to given number of places"""
 
-      for c in (self.df.columns):
-        if("float" in str(self.df[c].dtype)):
-          self.df[c] = round(self.df[c], self.round_to)
+      # one round over the float block rather than a pass per feature
+      floats = list(self.df.select_dtypes('floating').columns)
+      if(len(floats)!=0):
+          self.df[floats] = self.df[floats].round(self.round_to)
+          self.profile.invalidate(floats)
+          self.plan.record('round', {'columns': floats,
+                                     'decimals': self.round_to})
 
 
 class RowCleaner(Initiator):
@@ -140,11 +174,15 @@ class RowCleaner(Initiator):
         """Remove empty rows"""
 
         self.df = self.df.dropna(axis=0, how='all')
+        self.plan.record('drop_empty_rows')
 
     def rem_dupli_rows(self):
-        """Remove duplicate rows"""
+        """Remove duplicate rows, comparing whole rows, and report how many"""
 
-        self.df = self.df.drop_duplicates()
+        self.df, removed = dd.drop_duplicate_rows(self.df)
+        self.plan.record('drop_duplicates')
+        if(removed!=0):
+            print("Removed", removed, "duplicate rows")
 
 
 class ValueCleaner(Initiator):
@@ -163,20 +201,522 @@ class ValueCleaner(Initiator):
     def rem_space(self):
         """Remove trailing and leading whitespaces"""
          
-        for col in self.df.columns:
-            try: # to make it work only for str columns
-                self.df[col] = self.df[col].str.strip()
-            except:
-              continue
+        # only text features can be stripped
+        text = self.df.select_dtypes(include=TEXT_DTYPES).columns
+        results = map_columns(strip_column, self.df, text, self.n_jobs,
+                              self.backend)
+        stripped = []
+        for col, values in results.items():
+            if(values is not None):
+                self.df[col] = values
+                self.profile.invalidate(col)
+                stripped.append(col)
+        self.plan.record('strip', stripped)
+
+
+# The column-wise cleaning operations below work on one feature at a time,
+# so the features of a wide dataframe can be spread over a pool of threads
+# or processes(see map_columns). They are module level functions so that
+# they can be sent to worker processes.
+
+def strip_uniques(uniques):
+    """
+    Strip the text among the distinct values of a feature, leaving values
+    that are not text as they are
+    
+    Parameters:
+        uniques (array-like): The distinct values
+        
+    Returns:
+        pandas index: The stripped values, or None if none are text
+    """
+    
+    uniques = pd.Index(uniques, dtype=object)
+    is_text = uniques.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    if(not is_text.any()):
+        return None
+    return (uniques.where(~is_text, uniques.str.strip()))
+
+
+def strip_column(series):
+    """
+    Remove trailing and leading whitespaces of a text feature. The kernel
+    depends on the dtype: string features are stripped by pandas' string
+    kernel(Arrow's when the strings are Arrow-backed), while object and
+    category features are stripped on their distinct values, which are then
+    spread back over the rows.
+    
+    Parameters:
+        series (pandas series): The feature
+        
+    Returns:
+        pandas series: The stripped feature, or None if it is not text
+    """
+    
+    if(isinstance(series.dtype, pd.CategoricalDtype)):
+        categories = series.cat.categories
+        stripped = strip_uniques(categories)
+        if(stripped is None):
+            return None
+        if(stripped.equals(categories)):
+            return series
+        # stripping can make categories equal, so they are merged
+        codes, merged = pd.factorize(stripped)
+        old = series.cat.codes.to_numpy()
+        new = np.where(old==-1, -1, codes[old])
+        return (pd.Series(pd.Categorical.from_codes(
+                    new, merged, ordered=series.cat.ordered),
+                index=series.index, name=series.name))
+    
+    if(pd.api.types.is_string_dtype(series.dtype) and
+       (series.dtype!=object)):
+        return (series.str.strip())
+    
+    if(series.dtype!=object):
+        return None
+    codes, uniques = pd.factorize(series)
+    stripped = strip_uniques(uniques)
+    if(stripped is None):
+        return None
+    if(stripped.equals(pd.Index(uniques, dtype=object))):
+        return series
+    values = stripped.to_numpy()[codes]
+    values[codes==-1] = np.nan
+    return (pd.Series(values, index=series.index, name=series.name,
+                      dtype=object))
+
+
+def column_median(series):
+    """Median of a feature"""
+    
+    return (series.median())
+
+
+def column_mode(series):
+    """Lowest mode of a feature"""
+    
+    mode = series.mode()
+    return (mode.iloc[0] if mode.shape[0]!=0 else np.nan)
+
+
+def strip_column_symbols(series, symbol_dict):
+    """
+    Remove the non-numeric symbols of a feature and make it numeric
+    
+    Parameters:
+        series (pandas series): The feature
+        symbol_dict (dict): Symbols to remove, by feature
+        
+    Returns:
+        (numpy array, int): See strip_symbols
+    """
+    
+    return (strip_symbols(series, symbol_dict[series.name]))
+
+
+def apply_to_shard(func, frame, kwargs):
+    """Apply a column-wise operation to every feature of a shard"""
+    
+    return {col: func(frame[col], **kwargs) for col in frame.columns}
+
+
+def map_columns(func, df, columns, n_jobs=1, backend='thread', **kwargs):
+    """
+    Apply a column-wise operation to features of a dataframe, spread over a
+    pool of workers
+    
+    Threads share the dataframe; processes are sent only their shard of
+    features. The results are handed back by feature, for the caller to
+    put back into the dataframe one feature at a time.
+    
+    Parameters:
+        func (function): Module level function taking a feature(and kwargs)
+        df (pandas dataframe): The dataframe
+        columns (list): The features to apply the operation to
+        n_jobs (int): Number of workers; -1 for one per CPU (Default: 1)
+        backend (str): 'thread' or 'process' (Default: 'thread')
+        kwargs: Further arguments of func
+        
+    Returns:
+        dict: Result of the operation, by feature
+    """
+    
+    columns = list(columns)
+    if((n_jobs is None) or (n_jobs < 0)):
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(columns))
+    
+    if(n_jobs <= 1):
+        return {col: func(df[col], **kwargs) for col in columns}
+    
+    if(backend=='thread'):
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = pool.map(lambda col: func(df[col], **kwargs), columns)
+            return (dict(zip(columns, results)))
+    elif(backend=='process'):
+        shards = [columns[i::n_jobs] for i in range(n_jobs)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(apply_to_shard, func, df[shard], kwargs)
+                       for shard in shards]
+            for future in futures:
+                results.update(future.result())
+        return {col: results[col] for col in columns}
+    else:
+        raise ValueError("Unknown backend '" + str(backend) + "'. Choose "
+                         "'thread' or 'process'")
+
+
+def strip_symbols(series, symbols):
+    """
+    Remove non-numeric symbols from a feature and make it numeric. The
+    distinct values are cleaned and converted once, then spread back over
+    the rows.
+    
+    Parameters:
+        series (pandas series): The feature
+        symbols (list): The symbols to remove
+        
+    Returns:
+        (numpy array, int): The numeric values and the number of values
+                            that are not numbers even without the symbols
+    """
+    
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques).astype(str)
+    if(len(symbols)!=0):
+        rem = '[' + ''.join(map(re.escape, symbols)) + ']'
+        text = text.str.replace(rem, '', regex=True)
+    numbers = pd.to_numeric(text, errors='coerce').to_numpy(dtype=float)
+    
+    values = np.where(codes < 0, np.nan, numbers[codes])
+    lost = int(np.isnan(values).sum() - (codes < 0).sum())
+    return (values, lost)
+
+
+class CleaningPlan:
+    """
+    Record of every transformation made while cleaning a dataset, with the
+    parameters learned from it, so that the same cleaning can be replayed on
+    new data of the same table without asking anything
+    
+    The plan is a list of steps, each {'op': name, 'params': parameters}:
+        rename           {old name: new name}
+        drop_empty_rows  None
+        drop_columns     [features]
+        drop_duplicates  None
+        strip            [features]
+        drop_missing_rows None
+        impute           {feature: value}
+        strip_symbols    {feature: [symbols]}
+        round            {'columns': [features], 'decimals': n}
+    
+    Attributes:
+        steps (list): The recorded steps, in order
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, steps=None):
+        """
+        Constructor for the class
+        
+        Parameters:
+            steps (list): Recorded steps (Default: none yet)
+        """
+        
+        self.steps = list(steps or [])
+    
+    def record(self, op, params=None):
+        """
+        Record a transformation; transformations that changed nothing are
+        left out
+        
+        Parameters:
+            op (str): Name of the transformation
+            params: Its parameters
+        """
+        
+        if((params is not None) and (len(params)==0)):
+            return
+        self.steps.append({'op': op, 'params': params})
+    
+    def renames(self):
+        """
+        The features renamed by the plan
+        
+        Returns:
+            dict: Final name of every renamed feature, by original name
+        """
+        
+        mapping = {}
+        for step in self.steps:
+            if(step['op']!='rename'):
+                continue
+            renamed = set(mapping.values())
+            # features renamed before are renamed again under their new name
+            mapping = {old: step['params'].get(new, new)
+                       for old, new in mapping.items()}
+            for old, new in step['params'].items():
+                if(old not in renamed):
+                    mapping[old] = new
+        return mapping
+    
+    def save(self, path):
+        """
+        Write the plan to a .json file
+        
+        Parameters:
+            path (str): Path of the file
+        """
+        
+        with open(path, 'w') as file:
+            json.dump({'version': self.VERSION, 'steps': self.steps}, file,
+                      indent=4, default=self.to_json)
+    
+    @staticmethod
+    def to_json(value):
+        """
+        Convert a value learned from the data that json cannot write, e.g.
+        the mode of a datetime feature; timestamps and durations are tagged
+        with their type so that load gives them back
+        
+        Parameters:
+            value: The value
+            
+        Returns:
+            A value json can write
+        """
+        
+        if(isinstance(value, np.datetime64)):
+            value = pd.Timestamp(value)
+        elif(isinstance(value, np.timedelta64)):
+            value = pd.Timedelta(value)
+        if(isinstance(value, pd.Timestamp)):
+            return {'__type__': 'timestamp', 'value': value.isoformat()}
+        if(isinstance(value, pd.Timedelta)):
+            return {'__type__': 'timedelta', 'value': value.isoformat()}
+        if(isinstance(value, np.generic)):
+            return value.item()
+        raise TypeError("Cannot write a value of type " +
+                        type(value).__name__ + " to a cleaning plan")
+    
+    @staticmethod
+    def from_json(obj):
+        """
+        Turn the values tagged by to_json back into their types
+        
+        Parameters:
+            obj (dict): An object read from the .json file
+            
+        Returns:
+            The value, or obj itself if it is not tagged
+        """
+        
+        if(obj.get('__type__')=='timestamp'):
+            return pd.Timestamp(obj['value'])
+        if(obj.get('__type__')=='timedelta'):
+            return pd.Timedelta(obj['value'])
+        return obj
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Read a plan from a .json file
+        
+        Parameters:
+            path (str): Path of the file
+            
+        Returns:
+            CleaningPlan: The plan
+        """
+        
+        with open(path) as file:
+            plan = json.load(file, object_hook=cls.from_json)
+        if(plan.get('version')!=cls.VERSION):
+            raise ValueError("Unsupported cleaning plan version: " +
+                             str(plan.get('version')))
+        return (cls(plan['steps']))
+    
+    def replay(self, df):
+        """
+        Clean new data the way the plan was recorded
+        
+        Parameters:
+            df (pandas dataframe): The new data
+            
+        Returns:
+            pandas dataframe: The cleaned data
+        """
+        
+        # the steps change features in place on this copy only
+        df = df.copy()
+        for step in self.steps:
+            op, params = step['op'], step['params']
+            if(op=='rename'):
+                df = df.rename(columns=params)
+            elif(op=='drop_empty_rows'):
+                df = df.dropna(axis=0, how='all')
+            elif(op=='drop_columns'):
+                df = df.drop(params, axis=1, errors='ignore')
+            elif(op=='drop_duplicates'):
+                df = dd.drop_duplicate_rows(df)[0]
+            elif(op=='strip'):
+                cols = [c for c in params if c in df.columns]
+                for col in cols:
+                    values = strip_column(df[col])
+                    if(values is not None):
+                        df[col] = values
+            elif(op=='drop_missing_rows'):
+                df = df.dropna(axis=0, how='any')
+            elif(op=='impute'):
+                df = ImputationPlan({c: {'custom': v} for c, v in
+                                     params.items() if c in df.columns}
+                                    ).apply(df)[0]
+            elif(op=='strip_symbols'):
+                for col, symbols in params.items():
+                    if(col in df.columns):
+                        df[col] = strip_symbols(df[col], symbols)[0]
+            elif(op=='round'):
+                cols = [c for c in params['columns'] if c in df.columns]
+                df[cols] = df[cols].round(params['decimals'])
+            else:
+                raise ValueError("Unknown cleaning step '" + str(op) + "'")
+        return df
+
+
+class ImputationPlan:
+    """
+    The imputation methods chosen for the features of a dataframe, applied
+    in one go: the means and medians of all numeric features are computed
+    in one pass each, the modes in another, and every missing value is
+    filled by a single fillna
+
+    Attributes:
+        methods (dict): Imputation method by feature; 'mean', 'median',
+                        'mode' or {'custom': value}
+        values (dict): Values imputed with by the last apply, by feature
+        n_jobs (int): Number of workers the medians and modes of features
+                      are spread over
+        backend (str): Kind of workers, 'thread' or 'process'
+    """
+
+    def __init__(self, methods=None, n_jobs=1, backend='thread'):
+        """
+        Constructor for the class
+
+        Parameters:
+            methods (dict): Imputation method by feature (Default: none yet)
+            n_jobs (int): Number of workers (Default: 1)
+            backend (str): 'thread' or 'process' (Default: 'thread')
+        """
+
+        self.methods = dict(methods or {})
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.values = {}
+
+    def add(self, feature, method):
+        """
+        Plan the imputation of a feature
+
+        Parameters:
+            feature (str): The name of the feature
+            method: 'mean', 'median', 'mode' or {'custom': value}
+        """
+
+        self.methods[feature] = method
+
+    def features(self, method):
+        """
+        Features imputed with a method
+
+        Parameters:
+            method (str): 'mean', 'median', 'mode' or 'custom'
+
+        Returns:
+            list: Names of the features
+        """
+
+        if(method=='custom'):
+            return [f for f, m in self.methods.items() if isinstance(m, dict)]
+        return [f for f, m in self.methods.items() if m==method]
+
+    def fill_values(self, df):
+        """
+        Compute the value every feature is imputed with
+
+        Parameters:
+            df (pandas dataframe): The dataframe to be imputed
+
+        Returns:
+            dict: Value to impute with, by feature
+        """
+
+        values = {}
+        if(self.n_jobs!=1):
+            cols = self.features('mean')
+            if(len(cols)!=0):
+                values.update(df[cols].mean().to_dict())
+            values.update(map_columns(column_median, df,
+                                      self.features('median'), self.n_jobs,
+                                      self.backend))
+            values.update(map_columns(column_mode, df, self.features('mode'),
+                                      self.n_jobs, self.backend))
+        else:
+            for method in ('mean', 'median'):
+                cols = self.features(method)
+                if(len(cols)!=0):
+                    values.update(getattr(df[cols], method)().to_dict())
+            cols = self.features('mode')
+            if(len(cols)!=0):
+                values.update(df[cols].mode().iloc[0].to_dict()) # lowest mode
+        for col in self.features('custom'):
+            values[col] = self.methods[col]['custom']
+        return values
+
+    def apply(self, df):
+        """
+        Impute the missing values of the planned features
+
+        Parameters:
+            df (pandas dataframe): The dataframe to be imputed
+
+        Returns:
+            (pandas dataframe, pandas dataframe): The imputed dataframe and a
+                                                  report of the imputation
+        """
+
+        cols = [c for c in self.methods if c in df.columns]
+        mem_before = df[cols].memory_usage(index=False, deep=True).sum()
+        missing = int(df[cols].isna().sum().sum())
+        start = time.perf_counter()
+
+        values = self.fill_values(df[cols])
+        self.values = values
+        # memory optimized features may be categories
+        for col, value in values.items():
+            if((str(df[col].dtype)=='category') and
+               (value not in df[col].cat.categories)):
+                df[col] = df[col].cat.add_categories([value])
+        df = df.fillna(values)
+        seconds = time.perf_counter() - start
+
+        mem_after = df[cols].memory_usage(index=False, deep=True).sum()
+        report = pd.DataFrame([{
+            'Features': len(cols),
+            'Values Imputed': missing - int(df[cols].isna().sum().sum()),
+            'Time (s)': seconds,
+            'Memory Before (MB)': mem_before / 1024 ** 2,
+            'Memory After (MB)': mem_after / 1024 ** 2,
+            'Memory Delta (MB)': (mem_after - mem_before) / 1024 ** 2,
+        }])
+        return (df, report)
 
 
 class MissingValueDealer(Initiator):
     """ Deal with Missing Values """
 
-    __operations = []        # list of operations to be performed
-    __perform_missing = True # by default, assume that missing values exist
-    __feature_dict = {}      # dictionary of features according to num vs non-num
-
     def __init__(self, dataframe):
         """
         Constructor for the class
@@ -186,23 +726,22 @@ class MissingValueDealer(Initiator):
         """
         
         super(MissingValueDealer, self).__init__(dataframe)
+        # state belongs to the instance, so that cleaners can run side by
+        # side in one process
+        self.__operations = []        # list of operations to be performed
+        self.__perform_missing = True # by default, assume that missing values exist
+        self.__feature_dict = {}      # dictionary of features according to num vs non-num
 
     def disp_miss_percent(self):
         """
         Display missing value percentages in the dataset
         """
         
-        cols = []
-        miss_val_percent = []
-        
-        for feat in self.df.columns:
-            cols.append(feat)
-            miss_val_percent.append(
-                    self.df[feat].isna().sum() / self.df.shape[0]
-            )
+        stats = self.profile.bind(self.df).compute()
             
-        d = pd.DataFrame({'Name of Feature':cols,
-             'Percentage of Missing Values':miss_val_percent
+        d = pd.DataFrame({'Name of Feature':list(stats.index),
+             'Percentage of Missing Values':
+                 list(stats['nulls'] / self.df.shape[0])
              })
             
         print("Missing Value Percentages in the Dataset")
@@ -241,7 +780,7 @@ class MissingValueDealer(Initiator):
             feature (str): The name of the feature
         """
         
-        self.df[feature].fillna(self.df[feature].mean(), inplace=True)
+        self.apply_plan(ImputationPlan({feature: 'mean'}), verbose=False)
 
     def median_impute(self, feature):
         """
@@ -252,7 +791,7 @@ class MissingValueDealer(Initiator):
             feature (str): The name of the feature
         """
         
-        self.df[feature].fillna(self.df[feature].median(), inplace=True)
+        self.apply_plan(ImputationPlan({feature: 'median'}), verbose=False)
 
     def mode_impute(self, feature):
         """
@@ -263,15 +802,17 @@ class MissingValueDealer(Initiator):
             feature (str): The name of the feature
         """
         
-        mode = self.df[feature].mode()[0] # choose lowest mode
-        self.df[feature].fillna(mode, inplace=True)
+        self.apply_plan(ImputationPlan({feature: 'mode'}), verbose=False)
     
     def numeric_impute(self, feature):
         """
-        Impute missing values in a numeric feature
+        Choose how to impute missing values in a numeric feature
         
         Parameters:
             feature (str): The name of the feature
+            
+        Returns:
+            str: The imputation method, 'mean', 'median' or 'mode'
         """
         
         print(colored('Choose method for imputing missing values in numerical features >',
@@ -283,51 +824,65 @@ class MissingValueDealer(Initiator):
         print(colored("-> Enter 3 for 'Imputing with Mode'",
                       'white'))
         print()
-        method = input("Your Choice[1/2/3]: ")
+        method = self.answers.ask("Your Choice[1/2/3]: ", 'imputation',
+                                  feature, choices={'mean':'1', 'median':'2',
+                                                    'mode':'3'})
         
         if(method==''):
             method = '1'
             print("Default option, Mean Imputation triggered.")
     
-        if(method=='1'):
-            self.mean_impute(feature)
-        elif(method=='2'):
-            self.median_impute(feature)
+        if(method=='2'):
+            return 'median'
         elif(method=='3'):
-            self.mode_impute(feature)
+            return 'mode'
+        return 'mean'
     
     def non_numeric_impute(self, feature):
         """
-        Impute missing values in a non-numeric feature
+        Choose how to impute missing values in a non-numeric feature
         
         Parameters:
             feature (str): The name of the feature
+            
+        Returns:
+            str: The imputation method, always 'mode'
         """
         
-        mode = self.df[feature].mode()[0] # choose lowest mode
-        self.df[feature].fillna(mode, inplace=True)
+        return 'mode'
     
     def custom_impute(self, feature):
         """
-        Impute missing values with custom, user-defined values
+        Ask for the custom, user-defined value to impute missing values with
         
         Parameters:
             feature (str): The name of the feature
+            
+        Returns:
+            dict: The imputation method, {'custom': value}
         """
 
         if(feature in self.__feature_dict['numeric']):
-            value = float(input("Enter Value(Numeric) to Impute with: "))
+            value = float(self.answers.ask(
+                    "Enter Value(Numeric) to Impute with: ", 'imputation',
+                    feature, 'custom', default=None))
         else:
-            value = input("Enter Value(Non-numeric) to Impute with: ")
+            value = self.answers.ask(
+                    "Enter Value(Non-numeric) to Impute with: ", 'imputation',
+                    feature, 'custom', default=None)
 
-        self.df[feature].fillna(value, inplace=True)
+        return {'custom': value}
     
-    def impute(self, feature):
+    def choose_imputation(self, feature):
         """
-        Impute missing values in the feature based on user-interactions
+        Choose how to impute missing values in the feature based on
+        user-interactions
         
         Parameters:
             feature (str): The name of the feature
+            
+        Returns:
+            The imputation method; see ImputationPlan
         """
 
         print("Imputation For ", feature, " :")
@@ -346,29 +901,62 @@ class MissingValueDealer(Initiator):
         print(colored("[!] 'Custom Imputation' can be 'Time Consuming'",
                       'yellow'))
         print()
-        method = input("Your Choice[1/2]: ")
+        method = self.answers.ask("Your Choice[1/2]: ", 'imputation', feature,
+                                  choices={'mean':'1', 'median':'1',
+                                           'mode':'1', 'custom':'2'})
         
         if(method==''):
             method = '1'
             print("Default option, Statistical Imputation triggered.")
         
-        if(method=='1'):
-            if(feature in self.__feature_dict['numeric']):
-                print("Performing Numeric Imputation...")
-                self.numeric_impute(feature)
-            else:
-                print("Performing Non-numeric Imputation...")
-                self.non_numeric_impute(feature)
-        elif(method=='2'):
+        if(method=='2'):
             print("Initiating Custom Imputation...")
-            self.custom_impute(feature)
+            return (self.custom_impute(feature))
+        elif(feature in self.__feature_dict['numeric']):
+            print("Performing Numeric Imputation...")
+            return (self.numeric_impute(feature))
+        else:
+            print("Performing Non-numeric Imputation...")
+            return (self.non_numeric_impute(feature))
+    
+    def impute(self, feature):
+        """
+        Impute missing values in the feature based on user-interactions
+        
+        Parameters:
+            feature (str): The name of the feature
+        """
+
+        plan = ImputationPlan({feature: self.choose_imputation(feature)})
+        self.apply_plan(plan, verbose=False)
+        
+    def apply_plan(self, plan, verbose=True):
+        """
+        Impute the missing values of every feature in an imputation plan at
+        once
+        
+        Parameters:
+            plan (ImputationPlan): The imputation plan
+            verbose (bool): Display the imputation report (Default: True)
+        """
+        
+        self.df, report = plan.apply(self.df)
+        self.profile.invalidate(list(plan.methods))
+        self.plan.record('impute', plan.values)
+        
+        if(verbose):
+            print("Imputation report =>")
+            print(report.to_markdown(index=False))
+            print()
 
     def start_imputation(self):
         """Initiate the process of imputation on the dataframe"""
 
-        for col in self.df.columns:
-            if(self.df[col].isna().any().any()):
-                self.impute(col)
+        # every choice is made first, then all features are imputed together
+        plan = ImputationPlan(n_jobs=self.n_jobs, backend=self.backend)
+        for col in self.profile.bind(self.df).features_with_nulls():
+            plan.add(col, self.choose_imputation(col))
+        self.apply_plan(plan)
    
     def choose_option(self):
         """Ask user for their choice of method to deal"""
@@ -397,7 +985,10 @@ class MissingValueDealer(Initiator):
         print(colored("[!] 'Removing columns' can cause 'Data Loss'",
                       'yellow'))
         print()
-        choice = input("Your Choice[1/2/3/4]: ")
+        choice = self.answers.ask("Your Choice[1/2/3/4]: ", 'missing',
+                                  choices={'drop_rows':'1', 'impute':'2',
+                                           'drop_columns':'3', 'skip':'4'},
+                                  repeat='4')
         
         if(choice==''):
             choice = '1'
@@ -410,7 +1001,10 @@ class MissingValueDealer(Initiator):
         elif(choice=='3'):
             print("Removing columns with more than 60% as missing values")
             min_non_na = (0.4 * (self.df.shape[0]))
-            self.df = self.df.dropna(axis=1, thresh=min_non_na)
+            kept = self.df.dropna(axis=1, thresh=min_non_na).columns
+            self.plan.record('drop_columns',
+                             [c for c in self.df.columns if c not in kept])
+            self.df = self.df[kept]
             print(colored("Preview of dataframe after this operation >",
                           'red', 'on_white'))
             print(self.df.head().to_markdown())
@@ -423,6 +1017,7 @@ class MissingValueDealer(Initiator):
         else:
             print("Removing rows with atleast one missing value")
             self.df = self.df.dropna(how='any', axis=0)
+            self.plan.record('drop_missing_rows')
             print(colored("Preview of dataframe after this operation >",
                           'red', 'on_white'))
             print(self.df.head().to_markdown())
@@ -446,12 +1041,6 @@ class MissingValueDealer(Initiator):
 class ConsistencyChecker(Initiator):
     """Checks for and rectifies consistency-based issues with data"""
 
-    __type_dict = {}   # user defined datatype dictionary
-    __non_numeric_features = []
-    __mismatches = []  # features that have a type mismatch (only false non-num)
-    __symbol_list = [] # list of non-numeric symbols
-    __symbol_dict = {} # non-numeric symbols dictionary
-
     def __init__(self, dataframe):
         """
         Constructor for the class
@@ -461,10 +1050,15 @@ class ConsistencyChecker(Initiator):
         """
         
         super(ConsistencyChecker, self).__init__(dataframe)
+        self.__type_dict = {}   # user defined datatype dictionary
+        self.__non_numeric_features = []
+        self.__mismatches = []  # features that have a type mismatch (only false non-num)
+        self.__symbol_dict = {} # non-numeric symbols dictionary
         
     def find_non_numerics(self):
         """Find non-numeric features"""
         
+        self.__non_numeric_features = []
         for col in self.df.columns:
             datype = str(self.df[col].dtype)
             if(('int' in datype) or ('float' in datype)):
@@ -481,7 +1075,11 @@ class ConsistencyChecker(Initiator):
             feature (str): The name of the feature
         """
 
-        datype = input("Choose data type for " + feature + "[1/2]: ")
+        # features listed under 'consistency' in the answers are numeric
+        datype = self.answers.ask("Choose data type for " + feature +
+                                  "[1/2]: ", 'consistency', feature,
+                                  choices={'ignore':'2', 'strip':'2',
+                                           'drop':'2'})
         
         if(datype==''):
             datype = '1'
@@ -561,24 +1159,114 @@ class ConsistencyChecker(Initiator):
             print(colored('There are no datatype mismatches!\n',
                       'white','on_green'))
     
-    def make_symbol_list(self, feature):
+    def numeric_confidence(self, feature, sample_size=NUMERIC_SAMPLE_SIZE,
+                           random_state=42):
         """
-        Makes a list of non-numeric characters appearing in a feature
+        Estimate how much of a non-numeric feature is numbers in disguise,
+        by parsing a random sample of its values once currency symbols,
+        percent signs, thousands separators and spaces are stripped
         
         Parameters:
             feature (str): The name of the feature
+            sample_size (int): Number of values parsed
+                               (Default: NUMERIC_SAMPLE_SIZE)
+            random_state (int): Seed of the sample (Default: 42)
+            
+        Returns:
+            float: Share of the non-missing values of the sample that parse
+                   as numbers
+        """
+        
+        col = self.df[feature]
+        if(col.shape[0] > sample_size):
+            rng = np.random.RandomState(random_state)
+            col = col.iloc[rng.randint(0, col.shape[0], sample_size)]
+        col = col.dropna()
+        if(col.shape[0]==0):
+            return 0.0
+        
+        text = col.astype(str).str.replace(NUMERIC_NOISE, '', regex=True)
+        return (float(pd.to_numeric(text, errors='coerce').notna().mean()))
+    
+    def detect_numerics(self, threshold=NUMERIC_THRESHOLD,
+                        sample_size=NUMERIC_SAMPLE_SIZE):
+        """
+        Propose a datatype for every non-numeric feature from a sample of
+        its values
+        
+        Parameters:
+            threshold (float): Confidence above which a feature is proposed
+                               to be numeric (Default: NUMERIC_THRESHOLD)
+            sample_size (int): Number of values parsed per feature
+                               (Default: NUMERIC_SAMPLE_SIZE)
             
         Returns:
-            list: List of non-numeric symbols
+            pandas dataframe: Confidence and proposed type of every feature
         """
         
-        symbols = []
-        for i in range(len(feature)):
-            if(not(feature[i].isdigit()) and (feature[i]!='.') and
-               (not(feature[i] in self.__symbol_list))):
-                self.__symbol_list.append(feature[i])
-                symbols.append(feature[i])
-        return symbols
+        features = list(dict.fromkeys(self.__non_numeric_features))
+        confidence = [self.numeric_confidence(f, sample_size) for f in features]
+        proposals = pd.DataFrame({
+            'Feature': features,
+            'Numeric Confidence': confidence,
+        })
+        proposals['Proposed Type'] = np.where(
+                proposals['Numeric Confidence'] >= threshold, 'numeric',
+                'non-numeric')
+        return proposals
+    
+    def auto_rectify(self, threshold=NUMERIC_THRESHOLD):
+        """
+        Detect numeric-like features automatically and convert only those
+        to numbers, without asking about every feature
+        
+        Parameters:
+            threshold (float): Confidence above which a feature is converted
+                               (Default: NUMERIC_THRESHOLD)
+        """
+        
+        proposals = self.detect_numerics(threshold)
+        print("Numeric-like features detected from a sample of",
+              NUMERIC_SAMPLE_SIZE, "values each =>\n")
+        print(proposals.to_markdown(index=False))
+        print()
+        
+        for feat, datype in zip(proposals['Feature'],
+                                proposals['Proposed Type']):
+            self.__type_dict[feat] = datype
+        self.check_mismatch()
+        
+        for feat in self.__mismatches:
+            print("Converting", feat, "to numeric...")
+            self.find_noise(feat)
+        self.rem_symbols_all(self.__mismatches)
+        if(len(self.__mismatches)==0):
+            print(colored('No feature looks numeric; nothing to convert.\n',
+                          'green'))
+    
+    def symbol_counts(self, feature):
+        """
+        Count the non-numeric characters(anything but digits and '.')
+        appearing in a feature. Only the distinct values of the feature are
+        scanned; their counts weigh the symbols found in them.
+        
+        Parameters:
+            feature (str): The name of the feature
+            
+        Returns:
+            pandas series: Occurrences of every symbol, most frequent first
+        """
+        
+        counts = self.df[feature].dropna().astype(str).value_counts()
+        found = pd.DataFrame({
+            'symbol': counts.index.str.findall(r'[^\d.]'),
+            'count': counts.values
+        }).explode('symbol').dropna()
+        
+        if(found.shape[0]==0):
+            return (pd.Series([], dtype='int64'))
+        symbols = found.groupby('symbol')['count'].sum()
+        return (symbols.sort_values(ascending=False))
     
     def find_symbols(self, feature):
         """
@@ -589,10 +1277,30 @@ class ConsistencyChecker(Initiator):
             feature (str): The name of the feature
         """
 
-        symbols = (self.df[feature].apply(self.make_symbol_list))
-        symbols = list(itertools.chain.from_iterable(symbols))
-        self.__symbol_dict[feature] = symbols
-        print("\nNon-numeric Symbols in "+feature+ ": ", symbols)
+        symbols = self.symbol_counts(feature)
+        self.__symbol_dict[feature] = list(symbols.index)
+        print("\nNon-numeric Symbols in "+feature+ ": ",
+              ', '.join("'" + sym + "' (" + str(n) + ")"
+                        for sym, n in symbols.items()))
+
+    def find_noise(self, feature):
+        """
+        Identify the symbols to remove from a feature detected to be numeric:
+        only those stripped while detecting it(NUMERIC_NOISE), so that signs,
+        exponents and anything else a number is written with are kept, and
+        the feature is converted the way it was detected
+        
+        Parameters:
+            feature (str): The name of the feature
+        """
+        
+        symbols = self.symbol_counts(feature)
+        noise = [sym for sym in symbols.index
+                 if re.fullmatch(NUMERIC_NOISE, sym)]
+        self.__symbol_dict[feature] = noise
+        print("\nSymbols removed from "+feature+ ": ",
+              ', '.join("'" + sym + "' (" + str(symbols[sym]) + ")"
+                        for sym in noise))
 
     def disp_symbols(self):
         """Display all non-numeric symbols in all features"""
@@ -608,8 +1316,36 @@ class ConsistencyChecker(Initiator):
             feature (str): The name of the feature
         """
 
-        rem = re.compile('|'.join(map(re.escape, self.__symbol_dict[feature])))
-        self.df[feature] = [float(rem.sub('', text)) for text in self.df[feature]]
+        symbols = self.__symbol_dict[feature]
+        values, lost = strip_symbols(self.df[feature], symbols)
+        self.df[feature] = values
+        self.plan.record('strip_symbols', {feature: symbols})
+        if(lost!=0):
+            print(lost, "values of", feature, "are not numbers even without "
+                  "the symbols and have been made missing values")
+        self.profile.invalidate(feature)
+
+    def rem_symbols_all(self, features):
+        """
+        Remove non-numeric symbols in several features at once, spread over
+        the workers, and make them numeric
+        
+        Parameters:
+            features (list): The names of the features
+        """
+        
+        results = map_columns(strip_column_symbols, self.df, features,
+                              self.n_jobs, self.backend,
+                              symbol_dict=self.__symbol_dict)
+        for feature, (values, lost) in results.items():
+            self.df[feature] = values
+            self.plan.record('strip_symbols',
+                             {feature: self.__symbol_dict[feature]})
+            if(lost!=0):
+                print(lost, "values of", feature, "are not numbers even "
+                      "without the symbols and have been made missing "
+                      "values")
+            self.profile.invalidate(feature)
 
     def ignore(self, feature):
         """
@@ -630,6 +1366,7 @@ class ConsistencyChecker(Initiator):
         """
 
         self.df = self.df.drop([feature], axis=1)
+        self.plan.record('drop_columns', [feature])
 
     def user_rectification(self, feature):
         """
@@ -649,7 +1386,9 @@ class ConsistencyChecker(Initiator):
               "\nWARNINGS :\n"
               "[!] 'Removing the feature' leads to data loss\n")
         
-        choice = input("Your Choice[1/2/3]: ")
+        choice = self.answers.ask("Your Choice[1/2/3]: ", 'consistency',
+                                  feature, choices={'ignore':'1', 'strip':'2',
+                                                    'drop':'3'})
         
         if(choice==''):
             choice = '1'
@@ -728,14 +1467,24 @@ class ConsistencyChecker(Initiator):
             print(colored("[!] It is advised you answer all questions and not skip",
                       'yellow'))
             
-            print("Do you wish to skip this step of checking for inconsistencies?")
-            choice = input("Your Choice[Y/N]: ")
+            print("Do you wish to skip this step of checking for inconsistencies?"
+                  "\nEnter A to detect and convert numeric-like features "
+                  "automatically instead")
+            # answers that list features to check do not skip it
+            consistency = self.answers.get('consistency')
+            if(consistency=='auto'):
+                default = 'a'
+            else:
+                default = 'n' if consistency else ''
+            choice = self.answers.ask("Your Choice[Y/N/A]: ", default=default)
             choice = choice.lower()
             
             if(choice==''):
                 choice='y'
         
-            if(choice=='n'):
+            if(choice=='a'):
+                self.auto_rectify()
+            elif(choice=='n'):
                 # choose datatypes
                 self.make_dtype_dict()
                 self.check_mismatch()
@@ -761,15 +1510,26 @@ class DataCleaner(ColumnCleaner, RowCleaner, ValueCleaner, MissingValueDealer,
                   ConsistencyChecker):
     """Performs the operation of data cleaning"""
 
-    def __init__(self, dataframe):
+    def __init__(self, dataframe, answers=None, n_jobs=1, backend='thread'):
         """
         Constructor for the class
         
         Parameters:
             dataframe (pandas dataframe): The dataframe to be cleaned
+            answers (Answers): Answers to the questions asked while cleaning
+                               (Default: ask everything at the prompt)
+            n_jobs (int): Number of workers column-wise operations are
+                          spread over; -1 for one per CPU (Default: 1)
+            backend (str): 'thread' or 'process'; processes also run text
+                           operations in parallel, at the cost of sending
+                           them the features (Default: 'thread')
         """
         
         super(DataCleaner, self).__init__(dataframe)
+        if(answers is not None):
+            self.answers = answers
+        self.n_jobs = n_jobs
+        self.backend = backend
 
     def clean_df(self):
         """Complete cleaning of the dataframe"""
@@ -790,6 +1550,23 @@ class DataCleaner(ColumnCleaner, RowCleaner, ValueCleaner, MissingValueDealer,
         self.round_float_cols()       # rounds float columns
         self.establish_consistency()
 
+    def replay(self, plan):
+        """
+        Clean the dataframe with a recorded cleaning plan, without asking
+        anything
+        
+        Parameters:
+            plan (CleaningPlan): The plan
+        """
+        
+        start = time.perf_counter()
+        rows = self.df.shape[0]
+        self.df = plan.replay(self.df)
+        self.plan = CleaningPlan(plan.steps)
+        self.profile.invalidate()
+        print("Replayed", len(plan.steps), "cleaning steps on", rows,
+              "rows in {:.2f} s".format(time.perf_counter() - start))
+
     def disp_clean_df(self):
         """Display preview of cleaned dataset"""
 
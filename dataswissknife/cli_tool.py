@@ -8,9 +8,96 @@ __all__ = [
 	'classification_modelling',
 	'visualize_data',
 	'log_tracker',
+	'batch_runner',
 ]
 
+import argparse
+import os
+import subprocess
+import sys
+
 from dataswissknife import main_code
 
+# seconds `dsk` may spend importing before the banner is displayed
+IMPORT_BUDGET = 0.5
+
+def measure_import_time(budget=IMPORT_BUDGET):
+	"""
+	Measure the time taken to import the command line tool in a fresh
+	interpreter and compare it against the import-time budget
+
+	Parameters:
+		budget (float): Seconds allowed for the import (Default: IMPORT_BUDGET)
+
+	Returns:
+		bool: True if the import fits in the budget
+	"""
+
+	# -X importtime writes the cumulative time of every import to stderr
+	result = subprocess.run(
+			[sys.executable, '-X', 'importtime', '-c',
+			 'import dataswissknife.cli_tool'],
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+			universal_newlines=True, check=True)
+
+	modules = []
+	for line in result.stderr.splitlines():
+		parts = line.split('|')
+		if((len(parts)==3) and parts[1].strip().isdigit()):
+			modules.append((int(parts[1]), parts[2].rstrip()))
+
+	# top level imports are the ones that are not indented
+	total = sum(us for us, name in modules
+			 if(not name.startswith('  '))) / 1e6
+
+	print("Slowest imports:")
+	for us, name in sorted(modules, reverse=True)[:10]:
+		print("  {:8.3f} s  {}".format(us / 1e6, name.strip()))
+	print("Total import time: {:.3f} s (budget: {:.3f} s)".format(total,
+	      budget))
+
+	return (total <= budget)
+
 def main():
-	main_code.initiate_tool()
\ No newline at end of file
+	parser = argparse.ArgumentParser(
+			prog='dsk',
+			description="DataSwissKnife: A Handy Little Tool to aid your "
+						"Data Science Projects")
+	parser.add_argument('--import-time', action='store_true',
+						help="measure the startup import time of the tool "
+							 "against its budget and exit")
+	parser.add_argument('--answers', metavar='FILE',
+						help="run unattended, reading the answers to the "
+							 "tool's questions from a .json or .yaml file")
+	parser.add_argument('--batch', metavar='SOURCE',
+						help="run every dataset in a directory(or listed in a "
+							 "manifest file) through the answers file, each "
+							 "into its own project")
+	parser.add_argument('--workers', type=int, default=None,
+						help="number of worker processes for --batch "
+							 "(default: one per CPU)")
+	parser.add_argument('--dest', metavar='DIR', default=None,
+						help="directory the --batch projects are created in "
+							 "(default: project_dir of the answers file, else "
+							 "the current directory)")
+	args = parser.parse_args()
+
+	if(args.import_time):
+		sys.exit(0 if measure_import_time() else 1)
+
+	answers = None
+	if(args.answers is not None):
+		from dataswissknife.answers import Answers
+		answers = Answers.from_file(args.answers)
+
+	if(args.batch is not None):
+		if(answers is None):
+			parser.error("--batch needs an --answers file")
+		from dataswissknife import batch_runner as br
+		dest_dir = args.dest or answers.get('project_dir') or os.getcwd()
+		runner = br.BatchRunner(br.find_datasets(args.batch), answers.spec,
+								dest_dir, args.workers)
+		summary = runner.run()
+		sys.exit(0 if (summary['Status']!='failed').all() else 1)
+
+	main_code.initiate_tool(answers)
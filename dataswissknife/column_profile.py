@@ -0,0 +1,177 @@
+"""
+Module Column Profile
+=====================
+This module keeps the statistics of the features of a dataframe(datatype,
+missing values, cardinality, minimum and maximum) so that the stages of DSK
+can read them instead of scanning the data again every time they need them.
+
+The statistics of a feature are computed the first time they are asked for,
+together with those of every other feature that has none yet. A stage that
+changes the values of a feature in place has to invalidate it; dropping
+features or replacing the dataframe with one over the same rows keeps the
+statistics of the features that are left.
+"""
+
+import pandas as pd
+
+# statistics kept for every feature
+STATS = ['dtype', 'nulls', 'cardinality', 'min', 'max', 'constant']
+
+
+class ColumnProfile:
+    """
+    Statistics of the features of a dataframe, computed once and reused
+
+    Attributes:
+        df (pandas dataframe): The dataframe being profiled
+        stats (pandas dataframe): Statistics computed so far, one row per
+                                  feature
+    """
+
+    def __init__(self, dataframe=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            dataframe (pandas dataframe): The dataframe to be profiled
+                                          (Default: bind one later)
+        """
+
+        self.df = None
+        self.stats = pd.DataFrame(columns=STATS)
+        if(dataframe is not None):
+            self.bind(dataframe)
+
+    def bind(self, dataframe):
+        """
+        Profile a dataframe, keeping the statistics computed so far if it has
+        the same rows and only features that are already profiled(as after
+        dropping features)
+
+        Parameters:
+            dataframe (pandas dataframe): The dataframe to be profiled
+
+        Returns:
+            ColumnProfile: The profile itself
+        """
+
+        if(dataframe is self.df):
+            return self
+
+        if((self.df is not None) and
+           dataframe.index.equals(self.df.index) and
+           set(dataframe.columns).issubset(self.df.columns)):
+            self.stats = self.stats[self.stats.index.isin(dataframe.columns)]
+        else:
+            self.stats = pd.DataFrame(columns=STATS)
+        self.df = dataframe
+        return self
+
+    def invalidate(self, columns=None):
+        """
+        Forget the statistics of features whose values have changed
+
+        Parameters:
+            columns (list): The changed features (Default: all features)
+        """
+
+        if(columns is None):
+            self.stats = pd.DataFrame(columns=STATS)
+        else:
+            if(isinstance(columns, str)):
+                columns = [columns]
+            self.stats = self.stats.drop(columns, errors='ignore')
+
+    def compute(self):
+        """
+        Compute the statistics of every feature that has none yet, in one
+        pass over them
+
+        Returns:
+            pandas dataframe: Statistics of every feature
+        """
+
+        missing = [c for c in self.df.columns if c not in self.stats.index]
+        if(len(missing)!=0):
+            sub = self.df[missing]
+            stats = pd.DataFrame({
+                'dtype': sub.dtypes.astype(str),
+                'nulls': sub.isna().sum(),
+                'cardinality': sub.nunique(dropna=False),
+            })
+            numeric = sub.select_dtypes('number')
+            if(numeric.shape[1]!=0):
+                stats['min'] = numeric.min()
+                stats['max'] = numeric.max()
+            stats['constant'] = (stats['cardinality']==1)
+            stats = stats.reindex(columns=STATS)
+            if(self.stats.shape[0]==0):
+                self.stats = stats
+            else:
+                self.stats = pd.concat([self.stats, stats])
+
+        return (self.stats.loc[list(self.df.columns)])
+
+    def get(self, feature, stat):
+        """
+        A statistic of a feature
+
+        Parameters:
+            feature (str): The name of the feature
+            stat (str): The statistic, one of STATS
+
+        Returns:
+            The value of the statistic
+        """
+
+        if(feature not in self.stats.index):
+            self.compute()
+        return (self.stats.at[feature, stat])
+
+    def cardinality(self, feature):
+        """
+        Number of distinct values in a feature, missing values included
+
+        Parameters:
+            feature (str): The name of the feature
+
+        Returns:
+            int: The cardinality of the feature
+        """
+
+        return (int(self.get(feature, 'cardinality')))
+
+    def nulls(self, feature):
+        """
+        Number of missing values in a feature
+
+        Parameters:
+            feature (str): The name of the feature
+
+        Returns:
+            int: The number of missing values
+        """
+
+        return (int(self.get(feature, 'nulls')))
+
+    def constant_features(self):
+        """
+        Features with a single value
+
+        Returns:
+            list: Names of the constant features
+        """
+
+        stats = self.compute()
+        return (list(stats.index[stats['constant'].astype(bool)]))
+
+    def features_with_nulls(self):
+        """
+        Features with missing values
+
+        Returns:
+            list: Names of the features with missing values
+        """
+
+        stats = self.compute()
+        return (list(stats.index[stats['nulls'] > 0]))
@@ -0,0 +1,225 @@
+"""
+Module Dedupe Data
+==================
+This module removes duplicate rows and reports how many were removed.
+
+Dataframes in memory are deduplicated by pandas, which compares whole rows.
+Datasets larger than memory are deduplicated out of core: every row is
+hashed once into a 64-bit fingerprint, the fingerprints are partitioned to
+disk, every partition is deduplicated on its own, and the dataset is
+streamed again without its duplicate rows.
+
+Out of core, rows with the same fingerprint are dropped as duplicates
+without their values being compared. Two different rows get the same
+fingerprint with a probability of about n^2 / 2^65 for n rows, i.e.
+practically never, but a row lost that way is not reported.
+"""
+
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+from dataswissknife import load_data as ld
+from dataswissknife import store_data as sd
+
+
+def row_fingerprints(df):
+    """
+    Hash every row of a dataframe into a 64-bit fingerprint
+
+    Parameters:
+        df (pandas dataframe): The dataframe
+
+    Returns:
+        numpy array: uint64 fingerprint of every row
+    """
+
+    # every value is hashed on its own; factorizing the values first costs
+    # more than it saves on chunks of mostly distinct rows
+    return (pd.util.hash_pandas_object(df, index=False,
+                                       categorize=False).to_numpy())
+
+
+def drop_duplicate_rows(df):
+    """
+    Remove all but the first occurrence of every row
+
+    Parameters:
+        df (pandas dataframe): The dataframe
+
+    Returns:
+        (pandas dataframe, int): The dataframe without duplicates and the
+                                 number of rows removed
+    """
+
+    # exact, and faster and lighter than hashing the rows into fingerprints
+    duplicated = df.duplicated().to_numpy()
+    removed = int(duplicated.sum())
+    if(removed==0):
+        return (df, 0)
+    return (df[~duplicated], removed)
+
+
+class OutOfCoreDeduplicator:
+    """
+    Removes duplicate rows from a .csv dataset that does not fit in memory
+
+    Rows are compared by their fingerprints only, so two different rows
+    whose fingerprints collide count as duplicates(see the module notes).
+
+    Attributes:
+        datapath (str): The path to the dataset
+        chunksize (int): Number of rows read at a time
+        partitions (int): Number of files the fingerprints are spread over
+        rows (int): Number of rows read
+        duplicates (int): Number of duplicate rows removed
+    """
+
+    def __init__(self, datapath, store=None, chunksize=100000, partitions=64,
+                 tmp_dir=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            datapath (str): The path to the dataset
+            store (DataStore): Store the deduplicated dataset is written to
+                               (Default: a DataStore in the default format)
+            chunksize (int): Number of rows read at a time (Default: 100000)
+            partitions (int): Number of files the fingerprints are spread
+                              over; each must fit in memory (Default: 64)
+            tmp_dir (str): Directory for the partitions
+                           (Default: the system's temporary directory)
+        """
+
+        self.datapath = datapath
+        self.chunksize = chunksize
+        self.partitions = partitions
+        self.rows = 0
+        self.duplicates = 0
+        self.__store = store or sd.DataStore()
+        self.__tmp_dir = tmp_dir
+        self.__loader = ld.ChunkLoader(datapath, chunksize)
+
+    def fingerprints(self, chunk):
+        """
+        Fingerprints of a chunk; integer features are hashed as floats, so a
+        feature read as int in one chunk and as float in another(where it has
+        missing values) hashes the same
+
+        Parameters:
+            chunk (pandas dataframe): The chunk
+
+        Returns:
+            numpy array: uint64 fingerprint of every row
+        """
+
+        ints = chunk.select_dtypes('integer').columns
+        if(len(ints)!=0):
+            chunk = chunk.astype({c: 'float64' for c in ints})
+        return (row_fingerprints(chunk))
+
+    def partition(self, directory):
+        """
+        Spread the fingerprint and row number of every row over the
+        partition files
+
+        Parameters:
+            directory (str): Directory for the partition files
+        """
+
+        files = [open(os.path.join(directory, str(p) + ".bin"), 'wb')
+                 for p in range(self.partitions)]
+        try:
+            self.rows = 0
+            for chunk in self.__loader.load_chunks():
+                hashes = self.fingerprints(chunk)
+                records = np.empty(hashes.shape[0], dtype=[('hash', '<u8'),
+                                                           ('row', '<i8')])
+                records['hash'] = hashes
+                records['row'] = np.arange(self.rows,
+                                           self.rows + hashes.shape[0])
+                parts = (hashes % np.uint64(self.partitions)).astype(np.int64)
+                order = np.argsort(parts, kind='stable')
+                bounds = np.searchsorted(parts[order],
+                                         np.arange(self.partitions + 1))
+                for p in range(self.partitions):
+                    part = records[order[bounds[p]:bounds[p + 1]]]
+                    if(part.shape[0]!=0):
+                        part.tofile(files[p])
+                self.rows += hashes.shape[0]
+        finally:
+            for f in files:
+                f.close()
+
+    def duplicate_rows(self, directory):
+        """
+        Find the duplicate rows, one partition at a time
+
+        Parameters:
+            directory (str): Directory of the partition files
+
+        Returns:
+            numpy array: Sorted row numbers of all but the first occurrence
+                         of every row
+        """
+
+        duplicates = []
+        for p in range(self.partitions):
+            records = np.fromfile(os.path.join(directory, str(p) + ".bin"),
+                                  dtype=[('hash', '<u8'), ('row', '<i8')])
+            if(records.shape[0]==0):
+                continue
+            # rows were written in order, so the first index is the first row
+            first = np.zeros(records.shape[0], dtype=bool)
+            first[np.unique(records['hash'], return_index=True)[1]] = True
+            duplicates.append(records['row'][~first])
+
+        if(len(duplicates)==0):
+            return (np.empty(0, dtype=np.int64))
+        return (np.sort(np.concatenate(duplicates)))
+
+    def deduplicate(self, directory, name):
+        """
+        Write the dataset without its duplicate rows
+
+        Parameters:
+            directory (str): Directory to store the dataset in
+            name (str): Name of the dataset without extension
+
+        Returns:
+            str: Path of the written file
+        """
+
+        tmp = tempfile.mkdtemp(prefix="dsk-dedupe-", dir=self.__tmp_dir)
+        try:
+            self.partition(tmp)
+            duplicates = self.duplicate_rows(tmp)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.duplicates = duplicates.shape[0]
+
+        appender = self.__store.appender(directory, name)
+        try:
+            start = 0
+            for chunk in self.__loader.load_chunks():
+                end = start + chunk.shape[0]
+                lo, hi = np.searchsorted(duplicates, [start, end])
+                if(hi > lo):
+                    keep = np.ones(chunk.shape[0], dtype=bool)
+                    keep[duplicates[lo:hi] - start] = False
+                    chunk = chunk[keep]
+                appender.append(chunk)
+                start = end
+        finally:
+            appender.close()
+
+        return (appender.path)
+
+    def report(self):
+        """Display how many duplicate rows were removed"""
+
+        print("Rows read:", self.rows)
+        print("Duplicate rows removed:", self.duplicates)
+        print("Rows kept:", self.rows - self.duplicates)
@@ -0,0 +1,313 @@
+"""
+Module Encode Data
+==================
+This module one-hot encodes nominal features into sparse matrices, so that
+features with many categories take memory for the ones that are set only.
+
+The categories of every feature are learned from the train data. Test data
+and new rows are encoded onto the same features; values that were not seen
+in train, or that were left out to keep the number of features bounded, go
+into one "other" feature per nominal feature.
+
+Features with too many categories to learn(hundreds of thousands of SKUs,
+merchants or cities) are hashed instead: every value sets one of a fixed
+number of buckets, chosen by a hash of the value, so nothing is learned and
+memory does not grow with the number of categories.
+"""
+
+import numpy as np
+import pandas as pd
+
+OTHER = '__other__'  # name of the bucket of unknown categories
+DEFAULT_BUCKETS = 1024  # buckets of every hashed feature
+
+
+class OneHotEncoder:
+    """
+    One-hot encoder of nominal features with a vocabulary learned on train
+
+    The encoded features are named like those of pd.get_dummies, i.e.
+    <feature>_<category>, followed by <feature>___other__ for every feature.
+    Missing values set none of them.
+
+    Attributes:
+        max_categories (int): Most categories kept per feature, the most
+                              frequent ones; None keeps all of them
+        vocabulary (dict): Categories of every feature, by feature
+        columns (list): Names of the encoded features
+    """
+
+    def __init__(self, max_categories=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            max_categories (int): Most categories kept per feature; the rest
+                                  go to the other bucket (Default: None, all)
+        """
+
+        self.max_categories = max_categories
+        self.vocabulary = {}
+        self.columns = []
+
+    def fit(self, df, features):
+        """
+        Learn the categories of nominal features
+
+        Parameters:
+            df (pandas dataframe): The train dataframe
+            features (list): The nominal features
+
+        Returns:
+            OneHotEncoder: The encoder itself
+        """
+
+        self.vocabulary = {}
+        self.columns = []
+        for feat in features:
+            counts = df[feat].value_counts()
+            counts = counts[counts > 0]   # unused categories of a category
+            if(self.max_categories is not None):
+                counts = counts.iloc[:self.max_categories]
+            # sorted like the features of pd.get_dummies
+            categories = sorted(counts.index, key=str)
+            self.vocabulary[feat] = categories
+            self.columns += [feat + '_' + str(c) for c in categories]
+            self.columns.append(feat + '_' + OTHER)
+        return self
+
+    def transform(self, df):
+        """
+        One-hot encode the nominal features of a dataframe
+
+        Parameters:
+            df (pandas dataframe): The dataframe
+
+        Returns:
+            scipy csr matrix: The encoded features, one row per row of df
+        """
+
+        from scipy import sparse  # imported here; it is slow
+
+        rows = []
+        cols = []
+        offset = 0
+        for feat, categories in self.vocabulary.items():
+            values = df[feat]
+            codes = pd.Categorical(values, categories=categories).codes
+            codes = codes.astype(np.int64)
+            codes[(codes==-1) & values.notna().to_numpy()] = len(categories)
+            keep = np.flatnonzero(codes!=-1)
+            rows.append(keep)
+            cols.append(codes[keep] + offset)
+            offset += len(categories) + 1
+
+        rows = np.concatenate(rows) if len(rows)!=0 else np.empty(0, int)
+        cols = np.concatenate(cols) if len(cols)!=0 else np.empty(0, int)
+        data = np.ones(rows.shape[0], dtype=np.uint8)
+        return (sparse.csr_matrix((data, (rows, cols)),
+                                  shape=(df.shape[0], offset)))
+
+    def transform_frame(self, df):
+        """
+        One-hot encode the nominal features of a dataframe, replacing them
+        with sparse pandas features at the end of the dataframe
+
+        Parameters:
+            df (pandas dataframe): The dataframe
+
+        Returns:
+            pandas dataframe: The dataframe with the encoded features
+        """
+
+        encoded = pd.DataFrame.sparse.from_spmatrix(self.transform(df),
+                                                    index=df.index,
+                                                    columns=self.columns)
+        return (pd.concat([df.drop(list(self.vocabulary), axis=1), encoded],
+                          axis=1))
+
+
+class HashingEncoder:
+    """
+    Encoder of nominal features into a fixed number of buckets by hashing
+    their values(the hashing trick)
+
+    Nothing is learned from the data, so chunks and single rows are encoded
+    independently of each other and of the train data. Different values may
+    share a bucket; the more buckets, the rarer that is. The encoded
+    features are named <feature>_hash_<bucket>. Missing values set none of
+    them.
+
+    Attributes:
+        features (list): The hashed features
+        n_buckets (int): Buckets of every feature
+        columns (list): Names of the encoded features
+    """
+
+    def __init__(self, features, n_buckets=DEFAULT_BUCKETS):
+        """
+        Constructor for the class
+
+        Parameters:
+            features (list): The features to hash
+            n_buckets (int): Buckets of every feature
+                             (Default: DEFAULT_BUCKETS)
+        """
+
+        if(n_buckets < 1):
+            raise ValueError("A hashed feature needs at least one bucket")
+        self.features = list(features)
+        self.n_buckets = int(n_buckets)
+        self.columns = [feat + '_hash_' + str(b) for feat in self.features
+                        for b in range(self.n_buckets)]
+
+    def buckets(self, values):
+        """
+        Bucket of every value of a feature
+
+        Values are hashed as text, so that a value gets the same bucket
+        whether it comes in a batch or in a single row. Every value is hashed
+        on its own rather than once per distinct value, which keeps memory
+        independent of the number of categories.
+
+        Parameters:
+            values (pandas series): The values
+
+        Returns:
+            numpy array: Bucket of every value; -1 for missing values
+        """
+
+        if(pd.api.types.infer_dtype(values, skipna=True)!='string'):
+            values = values.astype(str).where(values.notna())
+        text = values.to_numpy(dtype=object)
+        hashes = (pd.util.hash_array(text, categorize=False) %
+                  np.uint64(self.n_buckets))
+        buckets = hashes.astype(np.int64)
+        buckets[values.isna().to_numpy()] = -1
+        return buckets
+
+    def bucket(self, value):
+        """
+        Bucket of a single value
+
+        Parameters:
+            value: The value
+
+        Returns:
+            int: Its bucket; -1 for a missing value
+        """
+
+        if(pd.isna(value)):
+            return -1
+        text = np.array([str(value)], dtype=object)
+        return (int(pd.util.hash_array(text, categorize=False)[0] %
+                    np.uint64(self.n_buckets)))
+
+    def transform(self, df):
+        """
+        Hash the features of a dataframe
+
+        Parameters:
+            df (pandas dataframe): The dataframe
+
+        Returns:
+            scipy csr matrix: The encoded features, one row per row of df
+        """
+
+        from scipy import sparse  # imported here; it is slow
+
+        rows = []
+        cols = []
+        for i, feat in enumerate(self.features):
+            buckets = self.buckets(df[feat])
+            keep = np.flatnonzero(buckets!=-1)
+            rows.append(keep)
+            cols.append(buckets[keep] + i * self.n_buckets)
+
+        rows = np.concatenate(rows) if len(rows)!=0 else np.empty(0, int)
+        cols = np.concatenate(cols) if len(cols)!=0 else np.empty(0, int)
+        data = np.ones(rows.shape[0], dtype=np.uint8)
+        return (sparse.csr_matrix((data, (rows, cols)),
+                                  shape=(df.shape[0], len(self.columns))))
+
+    def transform_frame(self, df):
+        """
+        Hash the features of a dataframe, replacing them with sparse pandas
+        features at the end of the dataframe
+
+        Parameters:
+            df (pandas dataframe): The dataframe
+
+        Returns:
+            pandas dataframe: The dataframe with the encoded features
+        """
+
+        encoded = pd.DataFrame.sparse.from_spmatrix(self.transform(df),
+                                                    index=df.index,
+                                                    columns=self.columns)
+        return (pd.concat([df.drop(self.features, axis=1), encoded], axis=1))
+
+
+def has_sparse(df):
+    """
+    Check if a dataframe has sparse features
+
+    Parameters:
+        df (pandas dataframe): The dataframe
+
+    Returns:
+        bool: True if any feature is sparse, else False
+    """
+
+    return (any(isinstance(dtype, pd.SparseDtype) for dtype in df.dtypes))
+
+
+def densify(df):
+    """
+    Turn the sparse features of a dataframe into dense ones, e.g. to store
+    it in a format that has no sparse type
+
+    Parameters:
+        df (pandas dataframe): The dataframe
+
+    Returns:
+        pandas dataframe: The dataframe with dense features only
+    """
+
+    sparse = {col: dtype.subtype for col, dtype in df.dtypes.items()
+              if isinstance(dtype, pd.SparseDtype)}
+    if(len(sparse)==0):
+        return df
+    return (df.astype(sparse))
+
+
+def to_csr(df):
+    """
+    Turn a dataframe with sparse features into a scipy csr matrix, keeping
+    the order of the features; the dense features must be numeric
+
+    Parameters:
+        df (pandas dataframe): The dataframe
+
+    Returns:
+        scipy csr matrix: The dataframe as a sparse matrix
+    """
+
+    from scipy import sparse  # imported here; it is slow
+
+    is_sparse = np.array([isinstance(dtype, pd.SparseDtype)
+                          for dtype in df.dtypes])
+    blocks = []
+    if((~is_sparse).any()):
+        blocks.append(sparse.csr_matrix(
+                df.loc[:, ~is_sparse].to_numpy(dtype=float)))
+    if(is_sparse.any()):
+        blocks.append(df.loc[:, is_sparse].sparse.to_coo().astype(float))
+    matrix = sparse.hstack(blocks, format='csr')
+
+    # the blocks hold the dense features first
+    order = np.concatenate([np.flatnonzero(~is_sparse),
+                            np.flatnonzero(is_sparse)])
+    if((order!=np.arange(order.shape[0])).any()):
+        matrix = matrix[:, np.argsort(order)]
+    return matrix
@@ -6,8 +6,44 @@ program
 """
 
 import pandas as pd
+import numpy as np
 import os
 import sys
+import time
+import json
+
+try:
+    import resource   # not available on Windows
+except ImportError:
+    resource = None
+
+from dataswissknife import store_data as sd
+
+STREAM_THRESHOLD = 1024 ** 3  # files larger than this(in bytes) are streamed
+
+# compact, arrow backed storage for text; only available with pandas>=1.3
+try:
+    STRING_DTYPE = pd.StringDtype("pyarrow")
+except (TypeError, ImportError, AttributeError):
+    STRING_DTYPE = None
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the running process
+    
+    Returns:
+        float: Peak RSS in megabytes (None if it cannot be measured)
+    """
+    
+    if(resource is None):
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if(sys.platform=='darwin'):
+        return peak / (1024 * 1024)
+    return peak / 1024
 
 
 class DataLoader:
@@ -17,25 +53,30 @@ class DataLoader:
     Attributes:
         datapath (str): The path to the dataset
         dest_dir (str): The path into which the dataset should be loaded
+        store (DataStore): Storage used for the loaded copy
     """
     
     __datapath = None  # path to dataset
     __dest_dir = None  # destination directory path
+    __store = None     # storage format of the loaded copy
     df_name = None     # name of the dataframe
     df = None          # dataframe
     
     
-    def __init__(self, datapath, dest_dir=None):
+    def __init__(self, datapath, dest_dir=None, store=None):
         """
         Constructor for the class
         
         Parameters:
             datapath (str): The path to the dataset
             dest_dir (str): The path into which the dataset should be loaded
+            store (DataStore): Storage used for the loaded copy
+                               (Default: parquet if available, else csv)
         """
         
         self.__datapath = datapath
         self.__dest_dir = dest_dir
+        self.__store = store or sd.DataStore()
         
     def name_df(self):
         """Asks the user for the new name to be applied to the dataset"""
@@ -52,7 +93,7 @@ class DataLoader:
             if(self.__dest_dir==None):
                 pass
             else:
-                self.df.to_csv(self.__dest_dir+"/"+self.df_name+".csv")
+                self.__store.write(self.df, self.__dest_dir, self.df_name)
         except:
             print("Error creating dataframe\n",
                   "Aborting...\n")
@@ -64,6 +105,406 @@ class DataLoader:
         self.load()
         return (self.df)
 
+
+class ChunkLoader:
+    """
+    Streams a dataset from local system in chunks of rows, so that large
+    files never have to be parsed in one go
+    
+    Attributes:
+        datapath (str): The path to the dataset
+        chunksize (int): Number of rows in each chunk
+        sample_rows (int): Number of leading rows used to infer dtypes
+    """
+    
+    def __init__(self, datapath, chunksize=100000, sample_rows=10000):
+        """
+        Constructor for the class
+        
+        Parameters:
+            datapath (str): The path to the dataset
+            chunksize (int): Number of rows in each chunk (Default: 100000)
+            sample_rows (int): Number of leading rows used to infer dtypes
+                               (Default: 10000)
+        """
+        
+        self.datapath = datapath
+        self.chunksize = chunksize
+        self.sample_rows = sample_rows
+        self.dtypes = None     # dtypes pinned for every chunk
+        self.rows_read = 0     # rows parsed so far
+        self.parse_time = 0.0  # seconds spent parsing
+        
+    def infer_dtypes(self):
+        """
+        Infer dtypes from a leading sample of the dataset
+        
+        Only float and object columns are pinned. Integer and boolean columns
+        are left for every chunk to infer, because a missing value further
+        down the file would make a pinned integer dtype fail. Columns that
+        are empty in the sample are left alone for the same reason.
+        
+        Returns:
+            dict: Mapping of column name to dtype
+        """
+        
+        sample = pd.read_csv(self.datapath, nrows=self.sample_rows)
+        self.dtypes = {}
+        for col in sample.columns:
+            if(sample[col].isna().all()):
+                continue
+            datype = str(sample[col].dtype)
+            if(('float' in datype) or (datype=='object')):
+                self.dtypes[col] = sample[col].dtype
+        
+        return self.dtypes
+    
+    def load_chunks(self):
+        """
+        Lazily load the dataset chunk by chunk
+        
+        Yields:
+            pandas dataframe: The next chunk of rows
+        """
+        
+        if(self.dtypes is None):
+            self.infer_dtypes()
+        
+        self.rows_read = 0
+        self.parse_time = 0.0
+        reader = pd.read_csv(self.datapath, dtype=self.dtypes,
+                             chunksize=self.chunksize)
+        while(True):
+            start = time.perf_counter()
+            try:
+                chunk = next(reader)
+            except StopIteration:
+                break
+            finally:
+                self.parse_time += time.perf_counter() - start
+            self.rows_read += chunk.shape[0]
+            yield chunk
+        
+        self.report()
+    
+    def load_dataframe(self, optimizer=None):
+        """
+        Streams the dataset and returns it as a single dataframe
+        
+        The whole dataset is held in memory, and while the chunks are joined
+        it is held twice. With an optimizer every chunk is made compact as
+        soon as it is read, so it is the compact dataset that has to fit in
+        memory twice rather than the parsed one. Files that do not fit in
+        memory even so are split with StreamingSplitter and deduplicated
+        with dedupe_data.OutOfCoreDeduplicator instead.
+        
+        Parameters:
+            optimizer (MemoryOptimizer): Optimizer of every chunk
+                                         (Default: None, no optimization)
+        
+        Returns:
+            pandas dataframe: The dataset
+        """
+        
+        if(optimizer is not None):
+            return (optimizer.optimize_chunks(self.load_chunks()))
+        return (pd.concat(self.load_chunks(), ignore_index=True))
+    
+    def sketch(self, error=None):
+        """
+        Stream the dataset into approximate statistics of every feature,
+        without holding more than one chunk in memory
+        
+        Parameters:
+            error (float): Error allowed in every statistic
+                           (Default: sketch_data.DEFAULT_ERROR)
+                           
+        Returns:
+            dict: sketch_data.ColumnSketch of every feature
+        """
+        
+        from dataswissknife import sketch_data as sk
+        return (sk.sketch_chunks(self.load_chunks(), error or sk.DEFAULT_ERROR))
+            
+    def report(self):
+        """Display the ingestion throughput and peak memory"""
+        
+        rows_per_sec = self.rows_read / self.parse_time if self.parse_time else 0
+        print("Rows read:", self.rows_read)
+        print("Ingestion rate: {:,.0f} rows/sec".format(rows_per_sec))
+        peak = peak_rss_mb()
+        if(peak is not None):
+            print("Peak memory (RSS): {:,.1f} MB".format(peak))
+
+    
+class MemoryOptimizer:
+    """
+    Reduces the memory taken by a dataframe by downcasting numeric features
+    and storing text features compactly
+    
+    Attributes:
+        max_unique_ratio (float): Text features with at most this fraction
+                                  of unique values are stored as categories
+        schema (dict): Original datatypes of the features
+        optimized (dict): Datatypes given to the features by the optimizer
+    """
+    
+    def __init__(self, max_unique_ratio=0.5):
+        """
+        Constructor for the class
+        
+        Parameters:
+            max_unique_ratio (float): Text features with at most this
+                                      fraction of unique values are stored
+                                      as categories (Default: 0.5)
+        """
+        
+        self.max_unique_ratio = max_unique_ratio
+        self.schema = {}
+        self.optimized = {}
+        
+    def compact_dtype(self, series):
+        """
+        Find the most compact datatype that holds a feature without loss
+        
+        Parameters:
+            series (pandas series): The feature
+            
+        Returns:
+            The compact datatype, or None if the feature should stay as is
+        """
+        
+        kind = series.dtype.kind
+        
+        if(kind in 'iu'):
+            if(series.empty):
+                return None
+            downcast = 'unsigned' if series.min() >= 0 else 'integer'
+            return (pd.to_numeric(series, downcast=downcast).dtype)
+        
+        elif(kind=='f'):
+            # float32 only if every value survives the round trip
+            as_32 = series.astype(np.float32)
+            if(((as_32==series) | series.isna()).all()):
+                return (np.dtype(np.float32))
+        
+        elif(kind=='O'):
+            num_rows = series.shape[0]
+            if((num_rows!=0) and
+               (series.nunique() / num_rows <= self.max_unique_ratio)):
+                return 'category'
+            elif(STRING_DTYPE is not None):
+                return STRING_DTYPE
+        
+        return None
+    
+    def optimize(self, df):
+        """
+        Convert the features of a dataframe into compact datatypes
+        
+        Parameters:
+            df (pandas dataframe): The dataframe, converted in place
+            
+        Returns:
+            pandas dataframe: The optimized dataframe
+        """
+        
+        before = df.memory_usage(deep=True).sum()
+        
+        self.schema = {col: str(df[col].dtype) for col in df.columns}
+        self.optimized = {}
+        for col in df.columns:
+            datype = self.compact_dtype(df[col])
+            if(datype is not None):
+                df[col] = df[col].astype(datype)
+                self.optimized[col] = str(df[col].dtype)
+        
+        after = df.memory_usage(deep=True).sum()
+        self.report(before, after)
+        
+        return df
+    
+    def optimize_chunks(self, chunks):
+        """
+        Join the chunks of a dataset into one compact dataframe, converting
+        every chunk as soon as it is read so that the dataset is never held
+        with its original datatypes
+        
+        Text features are stored the way the first chunk calls for in every
+        chunk, and the categories of all chunks are merged, so that they
+        stay categories once joined. Integers are downcast per chunk and
+        joined into the widest of their types.
+        
+        Parameters:
+            chunks (iterable): The chunks(pandas dataframes) of the dataset
+            
+        Returns:
+            pandas dataframe: The optimized dataframe
+        """
+        
+        before = 0
+        raw = {}     # original datatypes of every feature, per chunk
+        text = {}    # storage of every text feature, from the first chunk
+        pieces = []
+        for chunk in chunks:
+            before += chunk.memory_usage(deep=True).sum()
+            for col in chunk.columns:
+                raw.setdefault(col, []).append(chunk[col].dtype)
+                if(chunk[col].dtype.kind=='O'):
+                    if(col not in text):
+                        text[col] = self.compact_dtype(chunk[col])
+                    datype = text[col]
+                else:
+                    datype = self.compact_dtype(chunk[col])
+                if(datype is not None):
+                    chunk[col] = chunk[col].astype(datype)
+            pieces.append(chunk)
+        
+        if(len(pieces)==0):
+            raise ValueError("The dataset has no rows to load")
+        
+        for col in text:
+            if(text[col]!='category'):
+                continue
+            # chunks where the feature is empty were not read as text
+            for piece in pieces:
+                if(not isinstance(piece[col].dtype, pd.CategoricalDtype)
+                   and piece[col].isna().all()):
+                    piece[col] = piece[col].astype(object).astype('category')
+            parts = [piece[col] for piece in pieces]
+            if(all(isinstance(part.dtype, pd.CategoricalDtype)
+                   for part in parts)):
+                categories = parts[0].cat.categories
+                for part in parts[1:]:
+                    categories = categories.union(part.cat.categories)
+                for piece in pieces:
+                    piece[col] = piece[col].cat.set_categories(categories)
+        
+        df = pd.concat(pieces, ignore_index=True)
+        del pieces
+        
+        self.schema = {}
+        for col, dtypes in raw.items():
+            if(all(datype==dtypes[0] for datype in dtypes)):
+                self.schema[col] = str(dtypes[0])
+            elif(all(datype.kind in 'biuf' for datype in dtypes)):
+                self.schema[col] = str(np.result_type(*dtypes))
+            else:
+                self.schema[col] = 'object'
+        self.optimized = {col: str(df[col].dtype) for col in df.columns
+                          if(str(df[col].dtype)!=self.schema[col])}
+        
+        after = df.memory_usage(deep=True).sum()
+        self.report(before, after)
+        
+        return df
+    
+    def report(self, before, after):
+        """
+        Display the memory used before and after optimization
+        
+        Parameters:
+            before (int): Bytes used before optimization
+            after (int): Bytes used after optimization
+        """
+        
+        saved = (1 - after / before) * 100 if before else 0
+        table = pd.DataFrame({
+            'Memory before (MB)': [before / 1024 ** 2],
+            'Memory after (MB)': [after / 1024 ** 2],
+            'Reduction (%)': [saved],
+            'Features converted': [len(self.optimized)],
+        })
+        print("Memory usage of the dataset =>")
+        print(table.to_markdown(index=False))
+        print()
+        
+    def restore(self, df):
+        """
+        Convert features back to their original datatypes. Only features
+        still holding the datatype the optimizer gave them are restored, as
+        later stages may have changed the others on purpose.
+        
+        Parameters:
+            df (pandas dataframe): The optimized dataframe
+            
+        Returns:
+            pandas dataframe: The dataframe with its original schema
+        """
+        
+        if((len(self.optimized)!=0) and
+           (not any(col in df.columns for col in self.schema))):
+            raise ValueError("None of the features of the saved schema are "
+                             "in the dataframe; rename the schema along "
+                             "with the features")
+        
+        restore = {}
+        for col, datype in self.optimized.items():
+            if((col in df.columns) and (str(df[col].dtype)==datype)):
+                original = self.schema[col]
+                # missing values may have been introduced since loading
+                if(('int' in original) and df[col].isna().any()):
+                    original = 'float64'
+                restore[col] = original
+        
+        if(len(restore)==0):
+            return df
+        return (df.astype(restore))
+    
+    def rename(self, mapping):
+        """
+        Follow features that have been renamed since they were optimized
+        
+        Parameters:
+            mapping (dict): New name of every renamed feature, by old name
+        """
+        
+        self.schema = {mapping.get(col, col): datype
+                       for col, datype in self.schema.items()}
+        self.optimized = {mapping.get(col, col): datype
+                          for col, datype in self.optimized.items()}
+    
+    def check(self, df):
+        """
+        Compare the datatypes of a dataframe with the saved schema
+        
+        Parameters:
+            df (pandas dataframe): The dataframe
+            
+        Returns:
+            dict: (datatype in the schema, datatype in df) of every feature
+                  whose datatype differs
+        """
+        
+        return {col: (datype, str(df[col].dtype))
+                for col, datype in self.schema.items()
+                if((col in df.columns) and (str(df[col].dtype)!=datype))}
+    
+    def save_schema(self, path):
+        """
+        Save the original and optimized schema as a .json file
+        
+        Parameters:
+            path (str): Path of the .json file
+        """
+        
+        with open(path, 'w') as file:
+            json.dump({'schema': self.schema, 'optimized': self.optimized},
+                      file, indent=2)
+    
+    def load_schema(self, path):
+        """
+        Load a schema saved with save_schema
+        
+        Parameters:
+            path (str): Path of the .json file
+        """
+        
+        with open(path) as file:
+            saved = json.load(file)
+        self.schema = saved['schema']
+        self.optimized = saved['optimized']
+
     
 class DataSplitter:
     """
@@ -72,22 +513,27 @@ class DataSplitter:
     Attributes:
         dataframe (pandas dataframe): The main dataframe to be split
         split_data_path (str): The destination path of the split datasets
+        store (DataStore): Storage used for the split datasets
     """
     
     __df = None  # dataframe to be split up
     __split_data_path = None # path to the directory where split data is stored
+    __store = None # storage format of the split data
     
-    def __init__(self, dataframe, split_data_path):
+    def __init__(self, dataframe, split_data_path, store=None):
         """
         Constructor for the class
         
         Parameters:
             dataframe (pandas dataframe): The main dataframe to be split
             split_data_path (str): The destination path of the split datasets
+            store (DataStore): Storage used for the split datasets
+                               (Default: parquet if available, else csv)
         """
         
         self.__df = dataframe
         self.__split_data_path = split_data_path
+        self.__store = store or sd.DataStore()
         
     def store_split_data(self, train, test, solution):
         """
@@ -99,53 +545,404 @@ class DataSplitter:
             solution (pandas dataframe): The target feature of the testing set
         """
         
-        # Store the files back as train.csv, test.csv and submission.csv
-        train.to_csv(os.path.join(self.__split_data_path,"train.csv"),
-                     index=False)
-        test.to_csv(os.path.join(self.__split_data_path,"test.csv"),
-                    index=False)
-        solution.to_csv(os.path.join(self.__split_data_path,"test_solution.csv"),
-                        index=False)
+        # Store the files back as train, test and test_solution, all at once
+        self.__store.write_all({"train": train,
+                                "test": test,
+                                "test_solution": solution},
+                               self.__split_data_path)
         
-    def train_test_split(self, target, test_percent=0.20, random_state=42):
+    def test_positions(self, target, test_percent=0.20, random_state=42,
+                       stratify=False, group=None):
         """
-        Splits a whole dataset(.csv) for ML into train.csv, test.csv and 
-        test_solution.csv
+        Chooses the row positions that go into the testing set
+        
+        Parameters:
+            target (str): Target feature in the dataframe
+            test_percent (float): Percentage of data to be used as testing set
+                                  (Default: 0.20)
+            random_state (int): Seed value for reproducibility
+            stratify (bool): Keep the proportion of every target class the
+                             same in train and test (Default: False)
+            group (str): Feature whose groups must not be shared between
+                         train and test (Default: None)
+                         
+        Returns:
+            numpy array: Sorted row positions of the testing set
+        """
+        
+        rng = np.random.RandomState(random_state)
+        num_rows = self.__df.shape[0]
+        num_test_rows = int(round(num_rows * test_percent))
+        
+        if(group is not None):
+            # shuffle the groups and take whole groups until the test set
+            # is big enough; rows without a group always go to train
+            codes, uniques = pd.factorize(self.__df[group])
+            sizes = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            order = rng.permutation(len(uniques))
+            num_groups = 0
+            if(num_test_rows > 0):
+                num_groups = np.searchsorted(np.cumsum(sizes[order]),
+                                             num_test_rows) + 1
+            is_test_group = np.zeros(len(uniques) + 1, dtype=bool)
+            is_test_group[order[:num_groups]] = True
+            return (np.flatnonzero(is_test_group[codes]))
+        
+        elif(stratify):
+            # shuffle once, then stable sort by class so that every class is
+            # a contiguous block in random order; the head of each block is
+            # its share of the test set. Missing targets form their own class
+            codes = pd.factorize(self.__df[target])[0] + 1
+            perm = rng.permutation(num_rows)
+            perm = perm[np.argsort(codes[perm], kind='mergesort')]
+            counts = np.bincount(codes)
+            num_test = np.round(counts * test_percent).astype(np.int64)
+            starts = np.cumsum(counts) - counts
+            rank = np.arange(num_rows) - np.repeat(starts, counts)
+            return (np.sort(perm[rank < np.repeat(num_test, counts)]))
+        
+        else:
+            return (np.sort(rng.permutation(num_rows)[:num_test_rows]))
+    
+    def train_test_split(self, target, test_percent=0.20, random_state=42,
+                         stratify=False, group=None):
+        """
+        Splits a whole dataset for ML into train, test and test_solution
         
         Parameters:
             target (str): Target feature in the dataframe
             test_percent (float): Percentage of data to be used as testing set
                                   (Default: 0.20)
             random_state (int): Seed value for reproducibility        
+            stratify (bool): Keep the proportion of every target class the
+                             same in train and test (Default: False)
+            group (str): Feature whose groups must not be shared between
+                         train and test (Default: None)
+        
+        Returns:
+            (pandas dataframe, pandas dataframe, pandas dataframe): The train,
+            test and test_solution dataframes
         """
         
-        # number of rows for test data
-        num_test_rows = round(self.__df.shape[0] * test_percent)
+        test_pos = self.test_positions(target, test_percent, random_state,
+                                       stratify, group)
+        is_test = np.zeros(self.__df.shape[0], dtype=bool)
+        is_test[test_pos] = True
         
-        # Split the data into training and testing data
-        test = self.__df.sample(n=num_test_rows, random_state=random_state)
-        train = self.__df.drop(list(test.index)).reset_index(drop=True)
-        test = test.reset_index(drop=True)
+        # Split the data into training and testing data by position; every
+        # output is a single copy of the rows it needs
+        train = self.__df.take(np.flatnonzero(~is_test))
+        train.index = pd.RangeIndex(train.shape[0])
         
         # Store Target values of test separately; remove of the main dataframe
-        test_target = test[target].values
-        test = test.drop(target, axis=1)
+        target_pos = self.__df.columns.get_loc(target)
+        descriptors = [i for i in range(self.__df.shape[1]) if i!=target_pos]
+        test = self.__df.iloc[test_pos, descriptors]
+        test.index = pd.RangeIndex(test.shape[0])
 
         # Make the submission dataframe
         # This is the final values with which we have to
         # compare our predictions on the test dataset
-        solution = pd.DataFrame({target:test_target})
+        solution = self.__df.iloc[test_pos, [target_pos]]
+        solution.index = pd.RangeIndex(solution.shape[0])
         
         self.store_split_data(train, test, solution)
         
+        ext = self.__store.extension()
+        print("DATA HAS BEEN SPLIT INTO\n",
+              "> train"+ext+"\n",
+              "> test"+ext+"\n",
+              "> test_solution"+ext+"\n",
+              "Split data available at:\n",
+              self.__split_data_path)
+        
+        return (train, test, solution)
+    
+    def lazy_split(self, target, name, test_percent=0.20, random_state=42,
+                   stratify=False, group=None):
+        """
+        Splits the dataset by storing only the row positions of the testing
+        set next to the dataset, instead of three copies of the data
+        
+        Parameters:
+            target (str): Target feature in the dataframe
+            name (str): Name under which the whole dataset is stored in the
+                        split data path
+            test_percent (float): Percentage of data to be used as testing set
+                                  (Default: 0.20)
+            random_state (int): Seed value for reproducibility
+            stratify (bool): Keep the proportion of every target class the
+                             same in train and test (Default: False)
+            group (str): Feature whose groups must not be shared between
+                         train and test (Default: None)
+                         
+        Returns:
+            LazySplit: The split, materialized when asked for
+        """
+        
+        test_pos = self.test_positions(target, test_percent, random_state,
+                                       stratify, group)
+        split = LazySplit(self.__split_data_path, name, target, self.__store,
+                          self.__df)
+        split.save_index(test_pos)
+        
         print("DATA HAS BEEN SPLIT INTO\n",
-              "> train.csv\n",
-              "> test.csv\n",
-              "> test_solution.csv\n",
+              "> "+os.path.basename(split.index_path)+"(positions of the "
+              "test rows in "+name+")\n",
               "Split data available at:\n",
               self.__split_data_path)
         
+        return split
+
+
+class LazySplit:
+    """
+    A train/test split kept as a single stored dataset and a .npy file with
+    the row positions of the testing set. The train, test and test_solution
+    dataframes are only built when a stage asks for them.
+    
+    Attributes:
+        directory (str): Directory of the dataset and the index file
+        name (str): Name of the stored dataset
+        target (str): Target feature in the dataset
+        index_path (str): Path of the index file
+    """
+    
+    def __init__(self, directory, name, target, store=None, dataframe=None):
+        """
+        Constructor for the class
+        
+        Parameters:
+            directory (str): Directory of the dataset and the index file
+            name (str): Name of the stored dataset
+            target (str): Target feature in the dataset
+            store (DataStore): Storage of the dataset
+                               (Default: parquet if available, else csv)
+            dataframe (pandas dataframe): The dataset, if already in memory
+                                          (Default: read from the store)
+        """
+        
+        self.directory = directory
+        self.name = name
+        self.target = target
+        self.index_path = os.path.join(directory, name + "_test_index.npy")
+        self.__store = store or sd.DataStore()
+        self.__df = dataframe
+        
+    def save_index(self, test_pos):
+        """
+        Store the row positions of the testing set
+        
+        Parameters:
+            test_pos (numpy array): Sorted row positions of the testing set
+        """
+        
+        if((len(test_pos)==0) or (test_pos[-1] < np.iinfo(np.int32).max)):
+            test_pos = test_pos.astype(np.int32)
+        np.save(self.index_path, test_pos)
+        
+    def test_positions(self):
+        """
+        Memory maps the row positions of the testing set
+        
+        Returns:
+            numpy array: Row positions of the testing set
+        """
+        
+        return (np.load(self.index_path, mmap_mode='r'))
+    
+    def rows(self, is_test, columns=None):
+        """
+        Materialize the train or test rows of the dataset
+        
+        Parameters:
+            is_test (bool): True for the test rows, False for the train rows
+            columns (list): Only these features (Default: all features)
+            
+        Returns:
+            pandas dataframe: The rows, with a fresh index
+        """
+        
+        if(self.__df is not None):
+            df = self.__df if columns is None else self.__df[columns]
+        else:
+            df = self.__store.read(self.directory, self.name, columns)
+        
+        mask = np.zeros(df.shape[0], dtype=bool)
+        mask[self.test_positions()] = True
+        if(not is_test):
+            mask = ~mask
+        
+        rows = df.take(np.flatnonzero(mask))
+        rows.index = pd.RangeIndex(rows.shape[0])
+        return rows
+    
+    def columns(self):
+        """List the features of the dataset"""
+        
+        if(self.__df is not None):
+            return (list(self.__df.columns))
+        return (self.__store.columns(self.directory, self.name))
+    
+    def train(self, columns=None):
+        """Materialize the training set (descriptors and target)"""
+        
+        return (self.rows(False, columns))
+    
+    def test(self):
+        """Materialize the testing set (descriptors only)"""
+        
+        return (self.rows(True, [c for c in self.columns() if c!=self.target]))
+    
+    def solution(self):
+        """Materialize the target of the testing set"""
+        
+        return (self.rows(True, [self.target]))
+
+
+class StreamingSplitter:
+    """
+    Splits a dataset that does not fit in memory into train, test and
+    test_solution by streaming it chunk by chunk, so memory stays bounded by
+    the chunk size
+    
+    Attributes:
+        datapath (str): The path to the dataset
+        split_data_path (str): The destination path of the split datasets
+        store (DataStore): Storage used for the split datasets
+        chunksize (int): Number of rows in each chunk
+    """
+    
+    def __init__(self, datapath, split_data_path, store=None,
+                 chunksize=100000):
+        """
+        Constructor for the class
+        
+        Parameters:
+            datapath (str): The path to the dataset
+            split_data_path (str): The destination path of the split datasets
+            store (DataStore): Storage used for the split datasets
+                               (Default: parquet if available, else csv)
+            chunksize (int): Number of rows in each chunk (Default: 100000)
+        """
+        
+        self.datapath = datapath
+        self.split_data_path = split_data_path
+        self.store = store or sd.DataStore()
+        self.chunksize = chunksize
         
+    def quota_mask(self, chunk, target, test_percent, rng, seen, stratify):
+        """
+        Choose the test rows of a chunk so that every class(or the whole
+        stream, if not stratified) has sent floor(rows seen * test_percent)
+        rows to test so far. The rows are picked at random within the chunk.
+        
+        Parameters:
+            chunk (pandas dataframe): The chunk of rows
+            target (str): Target feature in the dataframe
+            test_percent (float): Percentage of data to be used as testing set
+            rng (numpy RandomState): Random number generator
+            seen (dict): Rows seen so far per class; updated in place
+            stratify (bool): Keep the quota separately for every class
+            
+        Returns:
+            numpy array: Boolean mask of the test rows
+        """
+        
+        if(stratify):
+            labels = chunk[target]
+            groups = labels.groupby(labels, sort=False).indices
+            missing = np.flatnonzero(labels.isna().values)
+            if(len(missing)!=0):
+                groups[None] = missing
+        else:
+            groups = {None: np.arange(chunk.shape[0])}
+        
+        mask = np.zeros(chunk.shape[0], dtype=bool)
+        for key, pos in groups.items():
+            before = seen.get(key, 0)
+            seen[key] = before + len(pos)
+            num_test = (int(seen[key] * test_percent) -
+                        int(before * test_percent))
+            mask[rng.permutation(pos)[:num_test]] = True
+        
+        return mask
+    
+    def hash_mask(self, chunk, test_percent, random_state):
+        """
+        Choose the test rows of a chunk from a hash of each row's values.
+        The same row always lands on the same side, whatever its position
+        in the file, so duplicates never leak from train into test.
+        
+        Parameters:
+            chunk (pandas dataframe): The chunk of rows
+            test_percent (float): Percentage of data to be used as testing set
+            random_state (int): Seed value for reproducibility
+            
+        Returns:
+            numpy array: Boolean mask of the test rows
+        """
         
+        hash_key = str(random_state).zfill(16)[-16:]
+        hashes = pd.util.hash_pandas_object(chunk, index=False,
+                                            hash_key=hash_key).values
+        return ((hashes % 1000000) < int(test_percent * 1000000))
+    
+    def train_test_split(self, target, test_percent=0.20, random_state=42,
+                         stratify=False, method='quota'):
+        """
+        Splits the dataset into train, test and test_solution one chunk at a
+        time, appending each part to its output
+        
+        Parameters:
+            target (str): Target feature in the dataframe
+            test_percent (float): Percentage of data to be used as testing set
+                                  (Default: 0.20)
+            random_state (int): Seed value for reproducibility
+            stratify (bool): Keep the proportion of every target class the
+                             same in train and test; only used by the
+                             'quota' method (Default: False)
+            method (str): 'quota' for exact proportions or 'hash' for a
+                          split decided by the values of each row
+                          (Default: 'quota')
+                          
+        Returns:
+            (int, int): Number of rows in train and test
+        """
+        
+        if(method not in ('quota', 'hash')):
+            raise ValueError("Unknown split method '" + str(method) + "'")
+        
+        rng = np.random.RandomState(random_state)
+        seen = {}    # rows seen per class; bounded by the number of classes
+        
+        train = self.store.appender(self.split_data_path, "train")
+        test = self.store.appender(self.split_data_path, "test")
+        solution = self.store.appender(self.split_data_path, "test_solution")
+        
+        loader = ChunkLoader(self.datapath, chunksize=self.chunksize)
+        try:
+            for chunk in loader.load_chunks():
+                if(method=='quota'):
+                    mask = self.quota_mask(chunk, target, test_percent, rng,
+                                           seen, stratify)
+                else:
+                    mask = self.hash_mask(chunk, test_percent, random_state)
+                
+                train.append(chunk[~mask])
+                test.append(chunk.loc[mask, chunk.columns!=target])
+                solution.append(chunk.loc[mask, [target]])
+        finally:
+            train.close()
+            test.close()
+            solution.close()
+        
+        ext = self.store.extension()
+        print("DATA HAS BEEN SPLIT INTO\n",
+              "> train"+ext+" ("+str(train.rows)+" rows)\n",
+              "> test"+ext+" ("+str(test.rows)+" rows)\n",
+              "> test_solution"+ext+"\n",
+              "Split data available at:\n",
+              self.split_data_path)
         
-        
\ No newline at end of file
+        return (train.rows, test.rows)
@@ -9,20 +9,16 @@ TODO
    waits
 """
 
-import pandas as pd
-import numpy as np
 import os
 import sys
-import matplotlib.pyplot as plt
-import seaborn as sns
-import tkinter as tk
-from tkinter import filedialog
 import pickle
 
 from colorama import Fore, Back, Style, init
 from termcolor import colored
 init()
 
+from dataswissknife.answers import Answers
+
 __all__ = [
   'main_code',
   'clean_data',
@@ -33,14 +29,55 @@ __all__ = [
   'log_tracker',
 ]
 
-from dataswissknife import load_data as ld
-from dataswissknife import clean_data as cd
-from dataswissknife import preprocess_data as prd
-from dataswissknife import visualize_data as vd
-from dataswissknife import classification_modelling as cm
+# The modules of every stage(and pandas, sklearn, matplotlib etc. with them)
+# are imported only when that stage runs, so that the tool starts instantly
+
+# Exit codes of the tool, so that a run stopped early as the answers asked
+# can be told apart from one that could not go on(e.g. by batch_runner)
+EXIT_STOPPED = 0  # stopped as requested; the stages run so far are done
+EXIT_FAILED = 1   # the dataset could not be loaded or processed
 
-def initiate_tool():
-  """ Initiate the tool """
+
+def choose_path(title, directory=False):
+  """
+  Ask the user for a path with a file dialog, or at the prompt when there is
+  no display(or no tkinter) to show the dialog on
+  
+  Parameters:
+      title (str): Title of the dialog
+      directory (bool): Choose a directory instead of a file
+      
+  Returns:
+      str: The chosen path
+  """
+
+  try:
+      import tkinter as tk
+      from tkinter import filedialog
+      window = tk.Tk()
+      window.title(title)
+      window.withdraw()
+      if(directory):
+          path = filedialog.askdirectory()
+      else:
+          path = filedialog.askopenfilename()
+      window.destroy()
+      return path
+  except Exception:  # no tkinter, or no display to open it on
+      return input(title + ": ").strip()
+
+
+def initiate_tool(answers=None):
+  """
+  Initiate the tool
+  
+  Parameters:
+      answers (Answers): Answers to the questions the tool asks, for running
+                         it unattended (Default: ask everything at the prompt)
+  """
+
+  if(answers is None):
+      answers = Answers()
 
   #-----Print the Welcome-----#
   print(colored((r"""
@@ -73,16 +110,15 @@ def initiate_tool():
   print("1. Choose a directory in your system in which you want the project structure to be built\n"
         "2. Enter the name of your project's root directory\n")
 
-  print("Please wait a moment while the 'Choose Folder' dialog opens...\n")
-
   # Choose the folder
-  dir_window = tk.Tk()
-  dir_window.title("Choose the directory")
-  dir_window.withdraw()
-  main_dir = filedialog.askdirectory()
+  main_dir = answers.require('project_dir')
+  if(main_dir is None):
+      print("Please wait a moment while the 'Choose Folder' dialog opens...\n")
+      main_dir = choose_path("Choose the directory", directory=True)
 
   # Make root
-  root_name = input("Enter the name of your project's root directory[root]: ")
+  root_name = answers.ask("Enter the name of your project's root "
+                          "directory[root]: ", 'root_name')
   if(root_name==''):
       root_name="root"
   root_path = os.path.join(main_dir, root_name)
@@ -106,6 +142,28 @@ def initiate_tool():
   processed_data_path = os.path.join(data_path, "processed")
   os.mkdir(processed_data_path)
 
+  # Choose how the project's datasets are stored
+  from dataswissknife import store_data as sd
+  print()
+  print("Choose the storage format of the project's datasets\n"
+        "-> 'parquet' and 'feather' are compressed and keep datatypes intact\n"
+        "-> 'csv' can be opened in any spreadsheet\n")
+  fmt = answers.ask("Storage format[parquet/feather/csv][" +
+                    sd.DEFAULT_FORMAT + "]: ", 'storage_format').lower()
+  if(fmt==''):
+      fmt = sd.DEFAULT_FORMAT
+  codecs = '/'.join(str(c) for c in sd.COMPRESSIONS.get(fmt, ()))
+  compression = answers.ask("Compression[" + codecs + "][default]: ",
+                            'compression').lower()
+  if(compression in ('', 'default')):
+      compression = None
+  try:
+      store = sd.DataStore(fmt, compression)
+  except (ValueError, ImportError) as e:
+      print(e)
+      print("Using", sd.DEFAULT_FORMAT, "instead.")
+      store = sd.DataStore()
+
   # outputs
   print()
   print(colored('OUTPUTS :', 'white', 'on_green'))
@@ -138,27 +196,53 @@ def initiate_tool():
   print("1. Choose the .csv dataset from your system\n"
         "2. Rename your dataset\n")
 
-  print("Please wait a moment while the 'Choose Dataset' dialog opens...\n")
-
   # Load the Dataset
-  data_window = tk.Tk()
-  data_window.title("Choose the dataset to load")
-  data_window.withdraw()
-  dataset_path = filedialog.askopenfilename()
+  dataset_path = answers.require('dataset')
+  if(dataset_path is None):
+      print("Please wait a moment while the 'Choose Dataset' dialog opens...\n")
+      dataset_path = choose_path("Choose the dataset to load")
+
+  # Shrink the dataset in memory
+  import pandas as pd
+  from dataswissknife import load_data as ld
+  from dataswissknife import pipeline as pl
+  optimizer = None
+  print("\nDo you wish to optimize the memory used by the dataset? Numeric "
+        "features are downcast and repetitive text is stored as categories.")
+  ch = answers.ask_yes_no("Enter your choice[Y/N][N]: ", 'optimize_memory')
+  if(ch.upper()=='Y'):
+      optimizer = ld.MemoryOptimizer()
 
   # Convert to Dataframe
+  # large datasets are read in chunks, optimized as they are read; the
+  # dataset still has to fit in memory(twice while the chunks are joined)
+  large = False
   try:
-      df = pd.read_csv(dataset_path)
-      DATASET_NAME = input("Rename this data file(You don't need to specify "
-                          "a .csv extension; no spaces allowed.)[data]: ")
+      large = os.path.getsize(dataset_path) > ld.STREAM_THRESHOLD
+      if(large):
+          print("Large dataset detected, loading it in chunks...")
+          df = ld.ChunkLoader(dataset_path).load_dataframe(optimizer)
+      else:
+          df = pd.read_csv(dataset_path)
+      DATASET_NAME = answers.ask("Rename this data file(You don't need to "
+                                 "specify an extension; no spaces allowed.)"
+                                 "[data]: ", 'dataset_name')
       if(DATASET_NAME==''):
           DATASET_NAME = "data"
-      raw_data_path = os.path.join(PROJ_RAW_DATA, (DATASET_NAME+".csv"))
-      df.to_csv(raw_data_path, index=False)
   except:
       print("Error creating dataframe. This program is self-terminating.\n"
             "Re-run it from beginning, be sure to load only a .csv file.")
-      sys.exit(0)
+      sys.exit(EXIT_FAILED)
+
+  if(optimizer is not None):
+      if(not large):
+          df = optimizer.optimize(df)
+      optimizer.save_schema(os.path.join(PROJ_REPORTS,
+                                         DATASET_NAME+"_schema.json"))
+
+  # the raw copy is written in the background while cleaning goes on
+  ctx = pl.PipelineContext(store)
+  raw_data_path = ctx.put('raw', df, PROJ_RAW_DATA, DATASET_NAME)
       
   # outputs
   print()
@@ -183,31 +267,56 @@ def initiate_tool():
   print(colored('INSTRUCTIONS :', 'white', 'on_blue'))
   print("1. Answer the following questions to clean up the data\n")
 
-  raw_data_path = os.path.join(PROJ_RAW_DATA, (DATASET_NAME+".csv"))
-  df = pd.read_csv(raw_data_path)
+  df = ctx.take('raw')
 
   # clean_data.py in action
-  dc = cd.DataCleaner(df)
-  dc.clean_df()
+  from dataswissknife import clean_data as cd
+  dc = cd.DataCleaner(df, answers,
+                      n_jobs=answers.get('n_jobs') or 1,
+                      backend=answers.get('parallel_backend') or 'thread')
+  plan_path = answers.get('cleaning_plan')
+  if(plan_path is not None):
+      # clean the way a previous run did, without asking anything
+      dc.replay(cd.CleaningPlan.load(plan_path))
+  else:
+      dc.clean_df()
+  dc.plan.save(os.path.join(PROJ_REPORTS, DATASET_NAME+"_cleaning_plan.json"))
   print("Preview of cleaned dataset :")
   print(dc.df.head().to_markdown())
 
   # store cleaned dataset
-  clean_data_path = os.path.join(PROJ_CLEAN_DATA, (DATASET_NAME+".csv"))
-  dc.df.to_csv(clean_data_path, index=False)
+  # the stored copy keeps the original schema; the live one stays compact
+  ctx.put('clean', dc.df)
+  if(optimizer is not None):
+      # the schema was saved under the names the features were loaded with
+      optimizer.rename(dc.plan.renames())
+      restored = optimizer.restore(dc.df)
+      changed = optimizer.check(restored)
+      if(len(changed)!=0):
+          print("Datatypes changed by cleaning(not restored) =>")
+          print(pd.DataFrame(changed, index=['Schema', 'Cleaned']).T
+                .to_markdown())
+          print()
+      clean_data_path = ctx.store.write(restored, PROJ_CLEAN_DATA,
+                                        DATASET_NAME)
+  else:
+      clean_data_path = ctx.store.write(dc.df, PROJ_CLEAN_DATA, DATASET_NAME)
 
   # outputs
   print()
   print(colored('OUTPUTS :', 'white', 'on_green'))
   print("The cleaned data has been loaded in", clean_data_path)
+  print("The cleaning steps have been recorded in",
+        os.path.join(PROJ_REPORTS, DATASET_NAME+"_cleaning_plan.json"))
 
   # does the user wish to continue?
   print(colored('\nDo you wish to continue to Data Preprocessing?', 'green'))
-  ch = input("Enter your choice[Y/N]: ")
+  ch = answers.ask_yes_no("Enter your choice[Y/N]: ", 'continue_preprocessing')
   if(ch.upper()=='N'):
+      ctx.close()
       print("\nTerminating DataSwissKnife as per your request.\n"
             "Project Stored at",PROJ_ROOT)
-      sys.exit(0)
+      sys.exit(EXIT_STOPPED)
 
 
   #-----Preprocessing the dataset-----#
@@ -222,7 +331,7 @@ def initiate_tool():
   print(colored('INSTRUCTIONS :', 'white', 'on_blue'))
   print("1. Answer the questions asked by the system to preprocess the data\n")
 
-  df = pd.read_csv(clean_data_path)
+  df = ctx.get('clean')
 
   # take in the target feature
   print("The following features are present in your cleaned dataset: ")
@@ -230,36 +339,41 @@ def initiate_tool():
   print()
   print("Which feature do you want to be the target feature? If you have no"
         " target feature, enter 'None'")
-  target = input("Enter Target Feature: ")
+  target = answers.ask("Enter Target Feature: ", 'target', default=None)
 
-  # split into train and test data (20% test)
+  # split into train and test data (20% test, stratified by target)
   if(target!='None'):
-      ds = ld.DataSplitter(df, PROJ_CLEAN_DATA)
-      ds.train_test_split(target, test_percent=0.20, random_state=42)
-      
-      # make them dataframes
-      train = pd.read_csv(os.path.join(PROJ_CLEAN_DATA,"train.csv"))
-      test = pd.read_csv(os.path.join(PROJ_CLEAN_DATA,"test.csv"))
-      test_solution = pd.read_csv(os.path.join(PROJ_CLEAN_DATA,"test_solution.csv"))
+      ds = ld.DataSplitter(df, PROJ_CLEAN_DATA, ctx.store)
+      (train, test, test_solution) = ds.train_test_split(target,
+                                                         test_percent=0.20,
+                                                         random_state=42,
+                                                         stratify=True)
+      ctx.put('train', train)
+      ctx.put('test', test)
+      ctx.put('test_solution', test_solution)
       
       # use the preprocessor class from preprocess_data.py
-      pp = prd.PreProcessor(train, test, test_solution, target)
+      from dataswissknife import preprocess_data as prd
+      # it works on copies; the split data is needed again for visualization
+      pp = prd.PreProcessor(train.copy(), test.copy(), test_solution.copy(),
+                            target, answers)
       (preproc_train, preproc_test, preproc_test_tar) = pp.give_output()
       
       # get data for modelling
       (X_tr, y_tr, X_te, y_te) = pp.towards_ml()
       
+      # store what was learned, to preprocess new rows for the model
+      pp.fitted().save(os.path.join(PROJ_MODELS, 'preprocessor.pkl'))
+      
       # store preprocessed files
-      preproc_train.to_csv((os.path.join(PROJ_PROCESSED_DATA,"train.csv")),
-                           index=False)
-      preproc_test.to_csv((os.path.join(PROJ_PROCESSED_DATA,"test.csv")),
-                           index=False)
-      preproc_test_tar.to_csv((os.path.join(PROJ_PROCESSED_DATA,"test_solution.csv")),
-                           index=False)
+      ctx.store.write_all({"train": preproc_train,
+                           "test": preproc_test,
+                           "test_solution": preproc_test_tar},
+                          PROJ_PROCESSED_DATA)
          
   elif(target=='None'):
       print("No target feature specified. So, no preprocessing performed.\n")
-      train = pd.read_csv(clean_data_path)
+      train = ctx.get('clean')
       # no need to go into preprocessing if there is no target
       pass
 
@@ -272,19 +386,24 @@ def initiate_tool():
   print()
   print(colored('OUTPUTS :', 'white', 'on_green'))
   print("1. The preprocessed data has been loaded in", PROJ_PROCESSED_DATA)
-  print("2.",PROJ_PROCESSED_DATA," has train.csv, test.csv and test_solution.csv")
-  print("3.",colored("train.csv", 'cyan'),"contains both descriptor and target features")
-  print("4.",colored("test.csv", 'cyan'),"contains only descriptor features")
-  print("5.",colored("test_solution.csv", 'cyan'),"contains only target features of"
-        "",colored("test.csv", 'cyan'))
+  ext = store.extension()
+  print("2.",PROJ_PROCESSED_DATA," has train"+ext+", test"+ext+" and "
+        "test_solution"+ext)
+  print("3.",colored("train"+ext, 'cyan'),"contains both descriptor and target features")
+  print("4.",colored("test"+ext, 'cyan'),"contains only descriptor features")
+  print("5.",colored("test_solution"+ext, 'cyan'),"contains only target features of"
+        "",colored("test"+ext, 'cyan'))
+  print("6. The fitted preprocessor has been stored at",
+        os.path.join(PROJ_MODELS, 'preprocessor.pkl'))
 
   # does the user wish to continue?
   print(colored('\nDo you wish to continue to auto-generating Data Visualizations?', 'green'))
-  ch = input("Enter your choice[Y/N]: ")
+  ch = answers.ask_yes_no("Enter your choice[Y/N]: ", 'continue_visualization')
   if(ch.upper()=='N'):
+      ctx.close()
       print("\nTerminating DataSwissKnife as per your request.\n"
             "Project Stored at",PROJ_ROOT)
-      sys.exit(0)
+      sys.exit(EXIT_STOPPED)
 
 
   #-----Auto-generating Visualizations-----#
@@ -298,11 +417,12 @@ def initiate_tool():
   """)
 
   # make them dataframes
-  train = pd.read_csv(os.path.join(PROJ_CLEAN_DATA,"train.csv"))
-  test = pd.read_csv(os.path.join(PROJ_CLEAN_DATA,"test.csv"))
-  test_solution = pd.read_csv(os.path.join(PROJ_CLEAN_DATA,"test_solution.csv"))
+  train = ctx.get('train')
+  test = ctx.get('test')
+  test_solution = ctx.get('test_solution')
 
   # use the visualizer class from visualize_data.py
+  from dataswissknife import visualize_data as vd
   viz = vd.FinalPlotter(train, test, target, pp.give_feat_list(), PROJ_VIZ)
   viz.plot_it_all()
 
@@ -313,11 +433,12 @@ def initiate_tool():
 
   # does the user wish to continue?
   print(colored('\nDo you wish to continue to Modelling?', 'green'))
-  ch = input("Enter your choice[Y/N]: ")
+  ch = answers.ask_yes_no("Enter your choice[Y/N]: ", 'continue_modelling')
   if(ch.upper()=='N'):
+      ctx.close()
       print("\nTerminating DataSwissKnife as per your request.\n"
             "Project Stored at",PROJ_ROOT)
-      sys.exit(0)
+      sys.exit(EXIT_STOPPED)
       
       
   #-----Modelling Data-----#
@@ -330,18 +451,24 @@ def initiate_tool():
    Build baseline predictive models for supervised classification 
   """)
 
-  bm = cm.Baseline(X_tr, y_tr, X_te, y_te)
+  from dataswissknife import classification_modelling as cm
+  bm = cm.Baseline(X_tr, y_tr, X_te, y_te, answers)
   model = bm.disp_it()
 
   # store the model as a .pkl file
   with open(os.path.join(PROJ_MODELS,'model.pkl'), 'wb') as file:
       pickle.dump(model, file=file)
    
+  # wait for the datasets still being written in the background
+  ctx.close()
+
   # outputs
   print()
   print(colored('OUTPUTS :', 'white', 'on_green'))
   print("Your preffered model has been stored at",
         os.path.join(PROJ_MODELS,'model.pkl'))
+  print("Preprocess new rows for it with",
+        os.path.join(PROJ_MODELS,'preprocessor.pkl'))
   print()
   print("Project Stored at",PROJ_ROOT)
 
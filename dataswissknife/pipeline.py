@@ -0,0 +1,237 @@
+"""
+Module Pipeline
+===============
+This module hands the live dataframes of DSK from one stage to the next, so
+that no stage has to wait for its input to be written to and parsed back
+from the project directory. Writing the datasets to disk happens on a
+background thread.
+"""
+
+import threading
+import queue
+import pandas as pd
+
+
+class AsyncStore:
+    """
+    Wraps a DataStore so that writes happen on a background writer thread
+
+    Attributes:
+        store (DataStore): The store that performs the actual writes
+    """
+
+    def __init__(self, store):
+        """
+        Constructor for the class
+
+        Parameters:
+            store (DataStore): The store that performs the actual writes
+        """
+
+        self.store = store
+        self.__jobs = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__pending = {}   # id of a dataframe -> number of pending writes
+        self.__errors = []    # (name, exception) of failed writes
+        self.__reports = []   # write reports of the finished jobs
+        self.__thread = threading.Thread(target=self.__run,
+                                         name="dsk-writer", daemon=True)
+        self.__thread.start()
+
+    def __run(self):
+        """Write queued dataframes until told to stop"""
+
+        while(True):
+            job = self.__jobs.get()
+            if(job is None):
+                self.__jobs.task_done()
+                break
+            frames, directory = job
+            try:
+                self.__reports.append(self.store.write_all(frames, directory,
+                                                           verbose=False))
+            except Exception as e:
+                self.__errors.append((', '.join(frames), e))
+            finally:
+                with self.__lock:
+                    for df in frames.values():
+                        self.__pending[id(df)] -= 1
+                        if(self.__pending[id(df)]==0):
+                            del self.__pending[id(df)]
+                self.__jobs.task_done()
+
+    def write(self, df, directory, name):
+        """
+        Queue a dataframe to be written without waiting for it
+
+        Parameters:
+            df (pandas dataframe): The dataframe to be stored
+            directory (str): Directory to store the dataset in
+            name (str): Name of the dataset without extension
+
+        Returns:
+            str: Path the file is being written to
+        """
+
+        self.write_all({name: df}, directory)
+        return (self.store.path(directory, name))
+
+    def write_all(self, frames, directory):
+        """
+        Queue several dataframes to be written concurrently, without waiting
+        for them
+
+        Parameters:
+            frames (dict): Dataframes to be stored, by dataset name
+            directory (str): Directory to store the datasets in
+        """
+
+        with self.__lock:
+            for df in frames.values():
+                self.__pending[id(df)] = self.__pending.get(id(df), 0) + 1
+        self.__jobs.put((dict(frames), directory))
+
+    def is_pending(self, df):
+        """
+        Check if a dataframe is still waiting to be written
+
+        Parameters:
+            df (pandas dataframe): The dataframe to check
+
+        Returns:
+            bool: True if a write of the dataframe has not finished yet
+        """
+
+        with self.__lock:
+            return (id(df) in self.__pending)
+
+    def flush(self):
+        """Wait for every queued write to finish"""
+
+        self.__jobs.join()
+        if(len(self.__errors)!=0):
+            name, e = self.__errors[0]
+            self.__errors = []
+            raise IOError("Could not store " + name + ": " + str(e))
+
+    def close(self):
+        """Finish pending writes and stop the writer thread"""
+
+        if(self.__thread.is_alive()):
+            self.__jobs.put(None)
+            self.__thread.join()
+        self.flush()
+
+    def report(self):
+        """
+        Write report of everything written so far
+
+        Returns:
+            pandas dataframe: Bytes written and throughput per dataset
+        """
+
+        if(len(self.__reports)==0):
+            return (pd.DataFrame())
+        return (pd.concat(self.__reports, ignore_index=True))
+
+    def extension(self, fmt=None):
+        """File extension of the wrapped store"""
+
+        return (self.store.extension(fmt))
+
+    def path(self, directory, name, fmt=None):
+        """Path of a dataset in the wrapped store"""
+
+        return (self.store.path(directory, name, fmt))
+
+    def read(self, directory, name, columns=None):
+        """Read a dataset back once all pending writes have finished"""
+
+        self.flush()
+        return (self.store.read(directory, name, columns))
+
+
+class PipelineContext:
+    """
+    Passes live dataframes between the stages of the pipeline and persists
+    them in the background
+
+    Attributes:
+        store (AsyncStore): Store used to persist the dataframes
+        frames (dict): Live dataframes by name
+    """
+
+    def __init__(self, store):
+        """
+        Constructor for the class
+
+        Parameters:
+            store (DataStore): The store of the project
+        """
+
+        self.store = AsyncStore(store)
+        self.frames = {}
+
+    def put(self, name, df, directory=None, filename=None):
+        """
+        Hand a dataframe to the following stages
+
+        Parameters:
+            name (str): Name the following stages ask for
+            df (pandas dataframe): The dataframe
+            directory (str): Persist the dataframe into this directory
+                             (Default: do not persist)
+            filename (str): Name of the stored dataset (Default: name)
+
+        Returns:
+            str: Path the dataframe is persisted to, if it is
+        """
+
+        self.frames[name] = df
+        if(directory is not None):
+            return (self.store.write(df, directory, filename or name))
+
+    def get(self, name):
+        """
+        Get a live dataframe; it must not be modified
+
+        Parameters:
+            name (str): Name of the dataframe
+
+        Returns:
+            pandas dataframe: The dataframe
+        """
+
+        return (self.frames[name])
+
+    def take(self, name):
+        """
+        Take a dataframe out of the context so that a stage may modify it.
+        A copy is handed over only if the dataframe is still being written.
+
+        Parameters:
+            name (str): Name of the dataframe
+
+        Returns:
+            pandas dataframe: The dataframe
+        """
+
+        df = self.frames.pop(name)
+        if(self.store.is_pending(df)):
+            return (df.copy())
+        return df
+
+    def close(self, verbose=True):
+        """
+        Wait for the background writes to finish
+
+        Parameters:
+            verbose (bool): Display the write report (Default: True)
+        """
+
+        self.store.close()
+        report = self.store.report()
+        if(verbose and (report.shape[0]!=0)):
+            print("Datasets written in the background =>")
+            print(report.to_markdown(index=False))
+            print()
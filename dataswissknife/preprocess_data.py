@@ -7,13 +7,25 @@ interaction
 
 import pandas as pd
 import numpy as np
-from sklearn import preprocessing
 
 import sys
 from colorama import Fore, Back, Style, init
 from termcolor import colored
 init()
 
+# nominal features with more categories are offered hashing
+HASH_CARDINALITY = 1000
+
+# methods of outlier detection and the cutoff of each
+OUTLIER_METHODS = {
+    'iqr': 1.5,     # beyond 1.5 inter-quartile ranges from the quartiles
+    'mad': 3.5,     # modified z-score(median absolute deviation) above 3.5
+    'zscore': 3.0,  # z-score above 3
+}
+
+from dataswissknife.answers import Answers
+from dataswissknife.column_profile import ColumnProfile
+
 class Essentials:
     """
     Performs essential operations in preprocessing 
@@ -25,12 +37,6 @@ class Essentials:
     y = None              # train target
     df_test = None        # test dataframe; user should never see this
     test_target = None    # test target
-    numericals = []       # numerical features
-    non_numericals = []   # non-numerical features
-    ratio = []            # ratio features
-    ordinal = []          # ordinal features
-    nominal = []          # nominal features
-    interval = []         # interval features
     interval_sep = None   # interval sepearator
     
     def __init__(self, dataframe, test_dataframe, test_solution, target):
@@ -44,6 +50,7 @@ class Essentials:
             target (str): The target feature
         """
 
+        self.answers = Answers()   # everything is asked at the prompt
         self.df = dataframe
         self.df_test = test_dataframe
         self.test_target = test_solution
@@ -53,6 +60,18 @@ class Essentials:
             self.y = self.df[[self.target]]
         else:
             self.X = self.df
+        # feature types belong to the instance, so that preprocessors can run
+        # side by side in one process
+        self.numericals = []       # numerical features
+        self.non_numericals = []   # non-numerical features
+        self.ratio = []            # ratio features
+        self.ordinal = []          # ordinal features
+        self.nominal = []          # nominal features
+        self.interval = []         # interval features
+        self.hashed = []           # nominal features encoded by hashing
+        # statistics of the train dataframe and of its descriptors
+        self.df_profile = ColumnProfile(self.df)
+        self.profile = ColumnProfile(self.X)
             
     def find_cardinality(self, feature):
         """
@@ -65,7 +84,22 @@ class Essentials:
             Cardinality of feature
         """
         
-        return (len(list(self.df[feature].unique())))
+        return (self.df_profile.bind(self.df).cardinality(feature))
+    
+    def plain_values(self, feat):
+        """
+        Turn a category feature of train and test back into plain values,
+        as the encoders write values that are not among its categories
+        
+        Parameters:
+            feat (str): The feature
+        """
+        
+        for frame in (self.X, self.df_test):
+            if((feat in frame.columns) and
+               isinstance(frame[feat].dtype, pd.CategoricalDtype)):
+                frame[feat] = frame[feat].astype(
+                        frame[feat].cat.categories.dtype)
     
     def prompt_id_removal(self):
         """
@@ -75,8 +109,9 @@ class Essentials:
         potential_ids = []
         above_70 = []
         
+        self.profile.bind(self.X)
         for feat in self.X.columns:
-            uniq_percent = len(self.X[feat].unique()) / (self.X.shape[0])
+            uniq_percent = self.profile.cardinality(feat) / (self.X.shape[0])
             if(uniq_percent == 1):
                 potential_ids.append(feat)
             elif(uniq_percent > 0.70):
@@ -99,14 +134,24 @@ class Essentials:
             print(colored(s, 'green'))
             print()
         
+        hash_features = self.answers.get('hash_features') or []
         for feat in above_70:
             print("Do you wish to remove the feature",feat,
                   "as it has a high unique value percentage(greater than 70%) ?",
-                  "\nEnter y for yes, else enter anything")
-            ans = input("Your Choice[Y/N]: ")
+                  "\nEnter y for yes, h to keep it hashed into a fixed number",
+                  "of buckets, else enter anything")
+            if(feat in hash_features):
+                ans = 'h'
+                print("Your Choice[Y/H/N]: " + ans)
+            else:
+                ans = self.answers.ask_yes_no("Your Choice[Y/H/N]: ",
+                                              'drop_features', feat)
             ans = ans.lower()
             if(ans=='y'):
                 self.X = self.X.drop([feat], axis=1)
+            elif((ans=='h') and
+                 (not pd.api.types.is_numeric_dtype(self.X[feat]))):
+                self.hashed.append(feat)
             else:
                 continue        
     
@@ -131,10 +176,12 @@ class Essentials:
         """
 
         print("Is the feature titled ",feat," an interval feature?")
-        ans = input("Your Choice[Y/N]: ")
+        ans = self.answers.ask_yes_no("Your Choice[Y/N]: ", 'intervals', feat)
         ans = ans.lower()
         if(ans=='y'):
-            separator = input("Enter the character used as separator: ")
+            separator = self.answers.ask(
+                    "Enter the character used as separator: ", 'intervals',
+                    feat, default=None)
             self.interval_sep = separator
             self.interval.append(feat)
         else:
@@ -154,8 +201,11 @@ class Essentials:
         print("Answer the following questions with y or n")
         print()
         for feat in (self.X.columns):
+            if(feat in self.hashed):
+                continue
             print("Do you wish to encode ",feat," as an ordinal feature?")
-            ans = input("Your Choice[Y/N]: ")
+            ans = self.answers.ask_yes_no("Your Choice[Y/N]: ", 'ordinal',
+                                          feat)
             ans = ans.lower()
             if(ans=='y'):
                 self.ordinal.append(feat)
@@ -182,6 +232,9 @@ class ProcessRatios(Essentials):
         
         super(ProcessRatios, self).__init__(dataframe, test_dataframe,
              test_solution, target)
+        self.scaling = {}         # minimum and range of scaled ratio features
+        self.outlier_report = None  # bounds and rows dropped, by feature
+        self.outlier_notes = {}     # how the bounds of a feature were found
       
     def to_rem_outliers(self, feat):
         """
@@ -195,13 +248,117 @@ class ProcessRatios(Essentials):
         """
         print()
         print("Do you wish to remove outliers in the feature titled",feat,"?")
-        ans = input("Your Choice[Y/N]: ")
+        ans = self.answers.ask_yes_no("Your Choice[Y/N]: ", 'remove_outliers',
+                                      feat)
         ans = ans.lower()
         if(ans=='n'):
             return False
         else:
           return True 
     
+    def choose_outlier_method(self):
+        """
+        Asks user how outliers are to be detected
+        
+        Returns:
+            str: The method, one of OUTLIER_METHODS
+        """
+        
+        print()
+        print("How do you wish to detect outliers?")
+        print("1. IQR: beyond 1.5 inter-quartile ranges from the quartiles"
+              "(default)")
+        print("2. MAD: modified z-score(median absolute deviation) above 3.5")
+        print("3. Z-score: more than 3 standard deviations from the mean")
+        ans = self.answers.ask("Your Choice[1/2/3]: ", 'outlier_method',
+                               choices={'iqr':'1', 'mad':'2', 'zscore':'3'})
+        return ({'2': 'mad', '3': 'zscore'}.get(ans.strip(), 'iqr'))
+    
+    def outlier_bounds(self, features, method='iqr'):
+        """
+        Lowest and highest values of features that are not outliers, for all
+        the features at once
+        
+        Parameters:
+            features (list): Ratio features
+            method (str): One of OUTLIER_METHODS (Default: 'iqr')
+            
+        Returns:
+            (pandas series, pandas series): Lower and upper bound by feature
+        """
+        
+        X = self.X[features]
+        cutoff = OUTLIER_METHODS[method]
+        if(method=='iqr'):
+            quartiles = X.quantile([0.25, 0.75])
+            Q1, Q3 = quartiles.iloc[0], quartiles.iloc[1]
+            IQR = Q3 - Q1
+            return (Q1 - cutoff * IQR, Q3 + cutoff * IQR)
+        elif(method=='mad'):
+            median = X.median()
+            deviation = (X - median).abs()
+            # 0.6745 makes the MAD of normal data equal its deviation
+            spread = deviation.median() / 0.6745
+            # the MAD is 0 when over half of the values equal the median;
+            # the mean absolute deviation(0.7979 for normal data) is used
+            # then, and features without any spread are left alone
+            tied = spread==0
+            if(tied.any()):
+                spread[tied] = deviation.loc[:, tied].mean() / 0.7979
+                for feat in spread.index[tied]:
+                    if(spread[feat] > 0):
+                        self.outlier_notes[feat] = ("MAD is 0; mean absolute "
+                                                    "deviation used")
+                    else:
+                        self.outlier_notes[feat] = "No spread; skipped"
+                spread[spread==0] = np.inf
+            return (median - cutoff * spread, median + cutoff * spread)
+        elif(method=='zscore'):
+            mean = X.mean()
+            spread = X.std()
+            return (mean - cutoff * spread, mean + cutoff * spread)
+        else:
+            raise ValueError("Unknown outlier method '" + str(method) +
+                             "'. Choose one of " + ', '.join(OUTLIER_METHODS))
+    
+    def filter_outliers(self, features, method='iqr'):
+        """
+        Removes the train rows with an outlier in any of the features: the
+        bounds of all features are found at once, combined into one row mask
+        and the rows are filtered once. The test data is left as it is.
+        
+        Parameters:
+            features (list): Ratio features to remove outliers from
+            method (str): One of OUTLIER_METHODS (Default: 'iqr')
+            
+        Returns:
+            pandas dataframe: Bounds and number of outliers by feature
+        """
+        
+        features = list(features)
+        self.outlier_notes = {}
+        lower, upper = self.outlier_bounds(features, method)
+        values = self.X[features].to_numpy(dtype=float)
+        # missing values are not outliers
+        outliers = ((values < lower.to_numpy(dtype=float)) |
+                    (values > upper.to_numpy(dtype=float)))
+        drop = outliers.any(axis=1)
+        
+        report = pd.DataFrame({'Method': method, 'Lower': lower,
+                               'Upper': upper,
+                               'Outliers': outliers.sum(axis=0)},
+                              index=features)
+        if(len(self.outlier_notes)!=0):
+            report['Note'] = pd.Series(self.outlier_notes).reindex(
+                    features).fillna('')
+        report.index.name = 'Feature'
+        if(drop.any()):
+            self.X = self.X[~drop]
+            self.profile.invalidate()
+        print("Removed", int(drop.sum()), "of", drop.shape[0],
+              "train rows with outliers")
+        return report
+    
     def outlier_rem(self, feat):
         """
         Removes outliers from ratio features using the IQR outlier removal
@@ -211,23 +368,7 @@ class ProcessRatios(Essentials):
             feat (str): Feature whose outlier has to be removed
         """
         
-        # finding inter-quartile range
-        Q1 = self.X[[feat]].quantile(0.25)
-        Q3 = self.X[[feat]].quantile(0.75)
-        IQR = Q3 - Q1
-        
-        # fitting on train
-        self.X[[feat]] = self.X[[feat]][~((self.X[[feat]] < (Q1 - 1.5 * IQR))|
-                (self.X[[feat]] > (Q3 + 1.5 * IQR))).any(axis=1)]
-        self.X = self.X.dropna()
-        
-        '''
-        don't remove any data from test
-        # for test
-        self.df_test[self.ratio] = self.df_test[self.ratio][~((self.df_test[self.ratio] < (Q1 - 1.5 * IQR))|
-                (self.df_test[self.ratio] > (Q3 + 1.5 * IQR))).any(axis=1)]
-        self.df_test = self.df_test.dropna()
-        '''
+        self.filter_outliers([feat])
         
     def minmaxscale(self, feat):
         """
@@ -244,7 +385,9 @@ class ProcessRatios(Essentials):
 
         if(min_val!=max_val):
             den = max_val-min_val
+            self.scaling[feat] = (float(min_val), float(den))
             self.X[feat] = (arr-min_val)/den
+            self.profile.invalidate(feat)
 
             # for test
             arr_test = self.df_test[feat].values
@@ -266,7 +409,7 @@ class ProcessRatios(Essentials):
         
         print("Do you wish to scale(normalize) the numerical features?")
         print()
-        ans = input("Your Choice[Y/N]: ")
+        ans = self.answers.ask_yes_no("Your Choice[Y/N]: ", 'scale')
         ans = ans.lower()
         if(ans=='n'):
             return False
@@ -282,11 +425,18 @@ class ProcessRatios(Essentials):
                       'red','on_white'))
         print()
         
+        features = []
         for feat in self.ratio:
             if(self.to_rem_outliers(feat)):
-                self.outlier_rem(feat)
+                features.append(feat)
             else:
                 print("Not removing outliers",feat,"as per your request...")
+        
+        if(len(features)!=0):
+            method = self.choose_outlier_method()
+            self.outlier_report = self.filter_outliers(features, method)
+            print(self.outlier_report.to_markdown())
+            print()
     
     def ratio_scaling(self):
         """
@@ -307,8 +457,6 @@ class ProcessRatios(Essentials):
 class ProcessOrdinals(Essentials):
     """Performs preprocessing operations on ordinal features"""
     
-    order_dict = {}           # order for ordinal features
-    
     def __init__(self, dataframe, test_dataframe, test_solution, target):
         """
         Constructor for the class
@@ -322,6 +470,7 @@ class ProcessOrdinals(Essentials):
         
         super(ProcessOrdinals, self).__init__(dataframe, test_dataframe,
              test_solution, target)
+        self.order_dict = {}      # order for ordinal features
         
     def take_order(self, feat):
         """
@@ -339,7 +488,9 @@ class ProcessOrdinals(Essentials):
               )
         
         print("Feature",feat)
-        order = input("Enter these values in order(separate with comma) => ")
+        order = self.answers.ask(
+                "Enter these values in order(separate with comma) => ",
+                'ordinal', feat, default=None)
         order = order.split(',')
         return order
         
@@ -360,11 +511,14 @@ class ProcessOrdinals(Essentials):
                 self.order_dict[feat] = dict(zip(order, labels))
                 
                 # label encode train
-                self.X.replace(self.order_dict[feat], inplace=True)
+                self.plain_values(feat)
+                self.X[feat] = self.X[feat].replace(self.order_dict[feat])
+                self.profile.invalidate(feat)
                 
                 # label encode test
                 # Assumption: No new category exists in the test set
-                self.df_test.replace(self.order_dict[feat], inplace=True)
+                self.df_test[feat] = self.df_test[feat].replace(
+                        self.order_dict[feat])
         else:
             pass
  
@@ -385,22 +539,78 @@ class ProcessNominals(Essentials):
         
         super(ProcessNominals, self).__init__(dataframe, test_dataframe,
              test_solution, target)
+        self.categories = {}      # categories of nominal features in train
+        self.encoder = None       # one-hot encoder fitted on train
+        self.hasher = None        # hashing encoder of high cardinality features
         
     def one_hot_encode(self):
         """
         One hot encodes the features
         """
         
+        from dataswissknife import encode_data as ed
+        
         if(len(self.nominal)!=0):
             print(colored('ONE HOT ENCODING NOMINAL FEATURES',
                           'red','on_white'))
             
-            # one-hot encode train
-            self.X = pd.get_dummies(self.X, columns=self.nominal)
+            # the categories are learned on train; test categories that
+            # train does not know go to the other bucket
+            self.encoder = ed.OneHotEncoder(self.answers.get('max_categories'))
+            self.encoder.fit(self.X, self.nominal)
+            self.categories = dict(self.encoder.vocabulary)
+            
+            # one-hot encode train, into sparse features
+            self.X = self.encoder.transform_frame(self.X)
+            self.profile.invalidate()
             
             # one-hot encode test
-            # Assumption: No new category exists in the test set
-            self.df_test = pd.get_dummies(self.df_test, columns=self.nominal)
+            self.df_test = self.encoder.transform_frame(self.df_test)
+        else:
+            pass
+    
+    def choose_hashing(self):
+        """
+        Asks user whether to hash nominal features with very many categories
+        instead of one-hot encoding them
+        """
+        
+        hash_features = self.answers.get('hash_features') or []
+        for feat in list(self.nominal):
+            cardinality = self.find_cardinality(feat)
+            if((feat not in hash_features) and
+               (cardinality <= HASH_CARDINALITY)):
+                continue
+            print()
+            print("The feature",feat,"has",cardinality,"categories. Do you",
+                  "wish to hash it into a fixed number of buckets instead",
+                  "of one-hot encoding it?")
+            ans = self.answers.ask_yes_no("Your Choice[Y/N]: ",
+                                          'hash_features', feat)
+            ans = ans.lower()
+            if(ans=='y'):
+                self.nominal.remove(feat)
+                self.hashed.append(feat)
+    
+    def hash_encode(self):
+        """
+        Encodes the features chosen for hashing into a fixed number of
+        buckets each
+        """
+        
+        from dataswissknife import encode_data as ed
+        
+        if(len(self.hashed)!=0):
+            print(colored('HASH ENCODING HIGH CARDINALITY FEATURES',
+                          'red','on_white'))
+            
+            n_buckets = self.answers.get('hash_buckets') or ed.DEFAULT_BUCKETS
+            self.hasher = ed.HashingEncoder(self.hashed, n_buckets)
+            
+            # nothing is learned, so train and test are hashed alike
+            self.X = self.hasher.transform_frame(self.X)
+            self.profile.invalidate()
+            self.df_test = self.hasher.transform_frame(self.df_test)
         else:
             pass
  
@@ -440,8 +650,10 @@ class ProcessIntervals(Essentials):
                           'red','on_white'))
             
             for feat in self.interval:
+                self.plain_values(feat)
                 # mean-encode train
                 self.X[feat] = self.X[feat].apply(self.mean_interval)
+                self.profile.invalidate(feat)
                 # mean-encode test
                 self.df_test[feat] = self.df_test[feat].apply(self.mean_interval)
                 
@@ -465,15 +677,19 @@ class ProcessTarget(Essentials):
         
         super(ProcessTarget, self).__init__(dataframe, test_dataframe,
              test_solution, target)
+        self.target_classes = None  # classes of the target, by label
         
     def encode_target(self):
         """Encode target"""
         
+        from sklearn import preprocessing  # imported here; it is slow
+        
         try:
             # Create a label (category) encoder object
             le = preprocessing.LabelEncoder()
             # Fit the encoder to the pandas column
             le.fit(self.y[self.target])
+            self.target_classes = le.classes_
 
             # encode test target
             self.test_target[self.target] = le.transform(self.test_target[self.target])
@@ -485,16 +701,243 @@ class ProcessTarget(Essentials):
             # hope the program never enters in here
             print("TEST TARGET HAS CLASSES NOT SEEN IN TRAIN DATA...\n",
                   "Currently, there is no support for this")
-            sys.exit(0)
+            sys.exit(1)   # main_code.EXIT_FAILED
             pass
 
+class FittedPreprocessor:
+    """
+    The parameters a PreProcessor learned from the train data, applied to
+    new rows: min-max scaling of ratio features, ordinal orders, one-hot
+    categories, hashed features and interval separator, and the classes of
+    the target
+    
+    The output features are laid out once when the preprocessor is built,
+    so that a single row is transformed with a loop over them and no
+    pandas overhead. Values that were not seen in the train data come out
+    as NaN(and in the other bucket for nominal features).
+    
+    Attributes:
+        columns (list): Features of the preprocessed data, in order
+        features (list): Features of the raw data that are read
+        scaling (dict): Minimum and range of every scaled ratio feature
+        order_dict (dict): Label of every value of every ordinal feature
+        categories (dict): Categories of every nominal feature
+        interval (list): Interval features
+        interval_sep (str): Separator of the interval features
+        target (str): The target feature
+        classes (numpy array): Class of every target label
+        hasher (HashingEncoder): Encoder of the hashed features
+    """
+    
+    def __init__(self, columns, scaling, order_dict, categories, interval,
+                 interval_sep, target, classes=None, hasher=None):
+        """
+        Constructor for the class
+        
+        Parameters:
+            columns (list): Features of the preprocessed data, in order
+            scaling (dict): Minimum and range of every scaled ratio feature
+            order_dict (dict): Label of every value of every ordinal feature
+            categories (dict): Categories of every nominal feature
+            interval (list): Interval features
+            interval_sep (str): Separator of the interval features
+            target (str): The target feature
+            classes (numpy array): Class of every target label
+                                   (Default: None, target not encoded)
+            hasher (HashingEncoder): Encoder of the hashed features
+                                     (Default: None, nothing hashed)
+        """
+        
+        self.columns = list(columns)
+        self.scaling = dict(scaling)
+        self.order_dict = dict(order_dict)
+        self.categories = dict(categories)
+        self.interval = list(interval)
+        self.interval_sep = interval_sep
+        self.target = target
+        self.classes = classes
+        self.hasher = hasher
+        
+        from dataswissknife.encode_data import OTHER
+        
+        # (kind, raw feature, parameter) of every output feature
+        dummies = {feat + '_' + str(value): (feat, value)
+                   for feat, values in self.categories.items()
+                   for value in values}
+        others = {feat + '_' + OTHER: (feat, frozenset(values))
+                  for feat, values in self.categories.items()}
+        hashed = {}
+        if(self.hasher is not None):
+            hashed = dict(zip(self.hasher.columns,
+                              [(feat, b) for feat in self.hasher.features
+                               for b in range(self.hasher.n_buckets)]))
+        self.__layout = []
+        for col in self.columns:
+            if(col in hashed):
+                self.__layout.append(('hash',) + hashed[col])
+            elif(col in dummies):
+                self.__layout.append(('dummy',) + dummies[col])
+            elif(col in others):
+                self.__layout.append(('other',) + others[col])
+            elif(col in self.scaling):
+                self.__layout.append(('scale', col, self.scaling[col]))
+            elif(col in self.order_dict):
+                self.__layout.append(('order', col, self.order_dict[col]))
+            elif(col in self.interval):
+                self.__layout.append(('interval', col, None))
+            else:
+                self.__layout.append(('value', col, None))
+        self.features = list(dict.fromkeys(f for _, f, _ in self.__layout))
+        # a row sets one bucket of a hashed feature, found by its position;
+        # the other buckets stay 0 without being looked at
+        self.__buckets = {}
+        self.__row_layout = []
+        for i, (kind, feat, param) in enumerate(self.__layout):
+            if(kind=='hash'):
+                self.__buckets.setdefault(feat, {})[param] = i
+            else:
+                self.__row_layout.append((i, kind, feat, param))
+    
+    def mean_interval(self, value):
+        """
+        Mean of an interval such as '10-20'
+        
+        Parameters:
+            value (str): The interval
+            
+        Returns:
+            float: Its mean, or NaN if it is not an interval
+        """
+        
+        try:
+            l = value.split(self.interval_sep)
+            return ((int(l[0]) + int(l[1]))/2)
+        except (AttributeError, ValueError, IndexError):
+            return np.nan
+    
+    def transform(self, df):
+        """
+        Preprocess a batch of raw rows
+        
+        Parameters:
+            df (pandas dataframe): Rows with the raw features
+            
+        Returns:
+            pandas dataframe: The preprocessed rows, as floats
+        """
+        
+        X = df.reindex(columns=self.features)
+        buckets = {feat: self.hasher.buckets(X[feat])
+                   for feat in self.__buckets}
+        out = {}
+        for (kind, feat, param), col in zip(self.__layout, self.columns):
+            values = X[feat]
+            if(kind=='hash'):
+                values = pd.Series(buckets[feat]==param, index=X.index)
+            elif(kind=='dummy'):
+                values = (values==param)
+            elif(kind=='other'):
+                values = (values.notna() & ~values.isin(param))
+            elif(kind=='scale'):
+                values = (pd.to_numeric(values, errors='coerce') -
+                          param[0]) / param[1]
+            elif(kind=='order'):
+                values = values.map(lambda v: param.get(v, v))
+            elif(kind=='interval'):
+                values = values.map(self.mean_interval)
+            out[col] = pd.to_numeric(values, errors='coerce')
+        return (pd.DataFrame(out, index=df.index, columns=self.columns)
+                .astype(float))
+    
+    def transform_row(self, row):
+        """
+        Preprocess a single raw row
+        
+        Parameters:
+            row (dict): Value of every raw feature
+            
+        Returns:
+            numpy array: The preprocessed row, in the order of columns
+        """
+        
+        out = np.zeros(len(self.__layout))
+        for i, kind, feat, param in self.__row_layout:
+            value = row.get(feat, np.nan)
+            if(kind=='dummy'):
+                out[i] = (value==param)
+                continue
+            if(kind=='other'):
+                out[i] = (not pd.isna(value)) and (value not in param)
+                continue
+            if(kind=='order'):
+                value = param.get(value, value)
+            elif(kind=='interval'):
+                value = self.mean_interval(value)
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                value = np.nan
+            if(kind=='scale'):
+                value = (value - param[0]) / param[1]
+            out[i] = value
+        for feat, positions in self.__buckets.items():
+            i = positions.get(self.hasher.bucket(row.get(feat, np.nan)))
+            if(i is not None):
+                out[i] = 1
+        return out
+    
+    def decode_target(self, labels):
+        """
+        Turn predicted labels back into the classes of the target
+        
+        Parameters:
+            labels (array-like): Predicted labels
+            
+        Returns:
+            numpy array: The classes
+        """
+        
+        if(self.classes is None):
+            return (np.asarray(labels))
+        return (np.asarray(self.classes)[np.asarray(labels)])
+    
+    def save(self, path):
+        """
+        Write the preprocessor to a .pkl file
+        
+        Parameters:
+            path (str): Path of the file
+        """
+        
+        import pickle
+        with open(path, 'wb') as file:
+            pickle.dump(self, file=file)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Read a preprocessor from a .pkl file
+        
+        Parameters:
+            path (str): Path of the file
+            
+        Returns:
+            FittedPreprocessor: The preprocessor
+        """
+        
+        import pickle
+        with open(path, 'rb') as file:
+            return (pickle.load(file))
+
+
 class PreProcessor(ProcessRatios, ProcessNominals, ProcessOrdinals,
                    ProcessIntervals, ProcessTarget):
     """ Main preprocessing class """
     
     final_train = None
 
-    def __init__(self, dataframe, test_dataframe, test_solution, target):
+    def __init__(self, dataframe, test_dataframe, test_solution, target,
+                 answers=None):
         """
         Constructor for the class
         
@@ -503,10 +946,15 @@ class PreProcessor(ProcessRatios, ProcessNominals, ProcessOrdinals,
             test_dataframe (pandas dataframe): The test dataframe without target
             test_solution (pandas dataframe): The target of test dataframe
             target (str): The target feature
+            answers (Answers): Answers to the questions asked while
+                               preprocessing (Default: ask everything at the
+                               prompt)
         """
 
         super(PreProcessor, self).__init__(dataframe, test_dataframe,
              test_solution, target)
+        if(answers is not None):
+            self.answers = answers
     
     def preprocess_data(self):
         """Preprocess data in steps"""
@@ -517,7 +965,9 @@ class PreProcessor(ProcessRatios, ProcessNominals, ProcessOrdinals,
         self.outlier_removal()
         self.ratio_scaling()
         self.encode_with_order()
+        self.choose_hashing()
         self.one_hot_encode()
+        self.hash_encode()
         self.mean_encode_intervals()
         self.encode_target()
         
@@ -603,3 +1053,18 @@ class PreProcessor(ProcessRatios, ProcessNominals, ProcessOrdinals,
         tt = self.test_target
         
         return (tr,te,tt)
+    
+    def fitted(self):
+        """
+        The parameters learned while preprocessing, to preprocess new rows
+        the same way; call after give_output
+        
+        Returns:
+            FittedPreprocessor: The fitted preprocessor
+        """
+        
+        columns = [c for c in self.final_train.columns if c!=self.target]
+        return (FittedPreprocessor(columns, self.scaling, self.order_dict,
+                                   self.categories, self.interval,
+                                   self.interval_sep, self.target,
+                                   self.target_classes, self.hasher))
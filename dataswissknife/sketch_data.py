@@ -0,0 +1,396 @@
+"""
+Module Sketch Data
+==================
+This module computes approximate statistics of datasets that are read chunk
+by chunk and never held in memory as a whole: quantiles(KLL sketch), number
+of distinct values(HyperLogLog) and most frequent values(Misra-Gries heavy
+hitters).
+
+Every sketch takes a bounded amount of memory, chosen from the error it is
+allowed to make, and is fed chunk by chunk with `update`. Sketches of the
+same kind can be merged, so chunks may also be sketched separately.
+
+Features held in memory are better served by pandas, whose exact statistics
+are as fast as the sketches there.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+
+DEFAULT_ERROR = 0.01     # relative error of the statistics of large datasets
+
+# bias correction of HyperLogLog for small numbers of registers
+HLL_ALPHA = {16: 0.673, 32: 0.697, 64: 0.709}
+
+
+class QuantileSketch:
+    """
+    KLL sketch of the quantiles of a numeric feature
+
+    Values are kept in a hierarchy of compactors; a full compactor is sorted
+    and every other value is promoted to the next level with twice the
+    weight. The rank of any value is then known within error * n.
+
+    Attributes:
+        k (int): Capacity of the largest compactor
+        n (int): Number of values seen
+    """
+
+    def __init__(self, error=DEFAULT_ERROR, seed=42):
+        """
+        Constructor for the class
+
+        Parameters:
+            error (float): Rank error allowed, as a fraction of the number of
+                           values (Default: DEFAULT_ERROR)
+            seed (int): Seed for choosing which values get promoted
+                        (Default: 42)
+        """
+
+        self.k = max(int(math.ceil(2.0 / error)), 8)
+        self.n = 0
+        self.__levels = [np.empty(0)]
+        self.__rng = np.random.RandomState(seed)
+
+    def capacity(self, level):
+        """Number of values a compactor may hold before it is compacted"""
+
+        depth = len(self.__levels) - level - 1
+        return (max(int(math.ceil(self.k * (2.0 / 3.0) ** depth)), 2))
+
+    def __compress(self):
+        """Compact every compactor that is over its capacity"""
+
+        level = 0
+        while(level < len(self.__levels)):
+            values = self.__levels[level]
+            if(values.shape[0] > self.capacity(level)):
+                if(level==len(self.__levels) - 1):
+                    self.__levels.append(np.empty(0))
+                values = np.sort(values)
+                # an odd value out waits for the next compaction
+                keep = values[:values.shape[0] % 2]
+                values = values[values.shape[0] % 2:]
+                promoted = values[self.__rng.randint(2)::2]
+                self.__levels[level] = keep
+                self.__levels[level + 1] = np.concatenate(
+                        [self.__levels[level + 1], promoted])
+                level = 0   # capacities change when a level is added
+            else:
+                level += 1
+
+    def update(self, values):
+        """
+        Feed values to the sketch; missing values are ignored
+
+        Parameters:
+            values (array-like): Numeric values
+        """
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += values.shape[0]
+        self.__levels[0] = np.concatenate([self.__levels[0], values])
+        self.__compress()
+
+    def merge(self, other):
+        """
+        Add the values seen by another sketch
+
+        Parameters:
+            other (QuantileSketch): The other sketch
+        """
+
+        while(len(self.__levels) < len(other.__levels)):
+            self.__levels.append(np.empty(0))
+        for level, values in enumerate(other.__levels):
+            self.__levels[level] = np.concatenate([self.__levels[level],
+                                                   values])
+        self.n += other.n
+        self.__compress()
+
+    def quantile(self, q):
+        """
+        Approximate quantiles of the values seen
+
+        Parameters:
+            q (float or list): Quantile(s) between 0 and 1
+
+        Returns:
+            float or numpy array: The quantile(s)
+        """
+
+        values = np.concatenate(self.__levels)
+        if(values.shape[0]==0):
+            return (np.nan if np.isscalar(q) else np.full(len(q), np.nan))
+        weights = np.concatenate([np.full(v.shape[0], 2.0 ** level)
+                                  for level, v in enumerate(self.__levels)])
+        order = np.argsort(values, kind='mergesort')
+        values = values[order]
+        ranks = np.cumsum(weights[order])
+        pos = np.searchsorted(ranks, np.asarray(q) * ranks[-1], side='left')
+        return (values[np.minimum(pos, values.shape[0] - 1)])
+
+    def median(self):
+        """Approximate median of the values seen"""
+
+        return (float(self.quantile(0.5)))
+
+
+def leading_zeros(x):
+    """
+    Count the leading zero bits of 64-bit unsigned integers
+
+    Parameters:
+        x (numpy array): uint64 values
+
+    Returns:
+        numpy array: Number of leading zeros of every value(64 for 0)
+    """
+
+    x = x.astype(np.uint64)
+    zeros = np.zeros(x.shape[0], dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        # the top `shift` bits are all zero
+        empty = (x >> np.uint64(64 - shift)) == 0
+        zeros[empty] += shift
+        x[empty] <<= np.uint64(shift)
+    zeros[x==0] = 64
+    return zeros
+
+
+class HyperLogLog:
+    """
+    HyperLogLog estimate of the number of distinct values of a feature
+
+    Attributes:
+        p (int): Number of hash bits choosing the register; the sketch holds
+                 2^p one-byte registers
+    """
+
+    def __init__(self, error=DEFAULT_ERROR):
+        """
+        Constructor for the class
+
+        Parameters:
+            error (float): Relative error allowed(one standard error)
+                           (Default: DEFAULT_ERROR)
+        """
+
+        self.p = min(max(int(math.ceil(math.log2((1.04 / error) ** 2))), 4),
+                     18)
+        self.__registers = np.zeros(2 ** self.p, dtype=np.uint8)
+
+    @property
+    def error(self):
+        """Standard error of the estimate"""
+
+        return (1.04 / math.sqrt(2 ** self.p))
+
+    def update(self, values):
+        """
+        Feed values to the sketch; missing values count as one value
+
+        Parameters:
+            values (array-like): Values of any type
+        """
+
+        hashes = pd.util.hash_pandas_object(pd.Series(values),
+                                            index=False).to_numpy()
+        if(hashes.shape[0]==0):
+            return
+        p = np.uint64(self.p)
+        registers = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        ranks = np.minimum(leading_zeros(hashes << p) + 1, 64 - self.p + 1)
+        # sorted by register and then rank, the last rank of every register
+        # is its largest; ranks are below 64 and there are at most 2^18
+        # registers, so both fit in one 32-bit key
+        keys = np.sort((registers * 64 + ranks).astype(np.int32))
+        registers = keys // 64
+        last = np.append(registers[1:]!=registers[:-1], True)
+        registers = registers[last]
+        ranks = (keys[last] % 64).astype(np.uint8)
+        self.__registers[registers] = np.maximum(self.__registers[registers],
+                                                 ranks)
+
+    def merge(self, other):
+        """
+        Add the values seen by another sketch of the same precision
+
+        Parameters:
+            other (HyperLogLog): The other sketch
+        """
+
+        np.maximum(self.__registers, other.__registers,
+                   out=self.__registers)
+
+    def count(self):
+        """
+        Approximate number of distinct values seen
+
+        Returns:
+            int: The estimate
+        """
+
+        m = float(self.__registers.shape[0])
+        alpha = HLL_ALPHA.get(int(m), 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / np.sum(2.0 ** -self.__registers.astype(float))
+        empty = int(np.sum(self.__registers==0))
+        if((estimate <= 2.5 * m) and (empty!=0)):
+            estimate = m * math.log(m / empty)   # linear counting
+        return (int(round(estimate)))
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of the most frequent values of a feature
+
+    The count of every value is underestimated by at most `error * n`, so
+    any value more frequent than that is sure to be kept.
+
+    Attributes:
+        k (int): Number of values tracked
+        n (int): Number of values seen
+        slack (int): How much any count may be underestimated by
+    """
+
+    def __init__(self, error=DEFAULT_ERROR):
+        """
+        Constructor for the class
+
+        Parameters:
+            error (float): Frequency error allowed, as a fraction of the
+                           number of values (Default: DEFAULT_ERROR)
+        """
+
+        self.k = max(int(math.ceil(1.0 / error)), 1)
+        self.n = 0
+        self.slack = 0
+        self.__counts = pd.Series([], dtype='int64')
+
+    def __trim(self, counts):
+        """Keep the k largest counts, decrementing all of them by the next"""
+
+        if(counts.shape[0] > self.k):
+            counts = counts.sort_values(ascending=False)
+            cut = int(counts.iloc[self.k])
+            counts = counts.iloc[:self.k] - cut
+            counts = counts[counts > 0]
+            self.slack += cut
+        self.__counts = counts
+
+    def update(self, values):
+        """
+        Feed values to the sketch; missing values are ignored
+
+        Parameters:
+            values (array-like): Values of any type
+        """
+
+        chunk = pd.Series(values).value_counts()
+        self.n += int(chunk.sum())
+        self.__trim(self.__counts.add(chunk, fill_value=0).astype('int64'))
+
+    def merge(self, other):
+        """
+        Add the values seen by another sketch
+
+        Parameters:
+            other (HeavyHitters): The other sketch
+        """
+
+        self.n += other.n
+        self.slack += other.slack
+        self.__trim(self.__counts.add(other.__counts,
+                                      fill_value=0).astype('int64'))
+
+    def top(self, n=10):
+        """
+        Most frequent values seen
+
+        Parameters:
+            n (int): Number of values (Default: 10)
+
+        Returns:
+            pandas series: Lower bounds of the counts of the values, most
+                           frequent first
+        """
+
+        return (self.__counts.sort_values(ascending=False).iloc[:n])
+
+    def mode(self):
+        """Most frequent value seen(the lowest one, if several are)"""
+
+        if(self.__counts.shape[0]==0):
+            return np.nan
+        top = self.__counts[self.__counts==self.__counts.max()]
+        return (sorted(top.index)[0])
+
+
+class ColumnSketch:
+    """
+    All the sketches of one feature
+
+    Attributes:
+        quantiles (QuantileSketch): Quantiles, for numeric features
+        distinct (HyperLogLog): Number of distinct values
+        frequent (HeavyHitters): Most frequent values
+        rows (int): Number of values seen
+        nulls (int): Number of missing values seen
+    """
+
+    def __init__(self, error=DEFAULT_ERROR, numeric=True):
+        """
+        Constructor for the class
+
+        Parameters:
+            error (float): Error allowed in every statistic
+                           (Default: DEFAULT_ERROR)
+            numeric (bool): Keep quantiles (Default: True)
+        """
+
+        self.quantiles = QuantileSketch(error) if numeric else None
+        self.distinct = HyperLogLog(error)
+        self.frequent = HeavyHitters(error)
+        self.rows = 0
+        self.nulls = 0
+
+    def update(self, series):
+        """
+        Feed a chunk of the feature to the sketches
+
+        Parameters:
+            series (pandas series): The chunk
+        """
+
+        self.rows += series.shape[0]
+        self.nulls += int(series.isna().sum())
+        if(self.quantiles is not None):
+            self.quantiles.update(series)
+        self.distinct.update(series)
+        self.frequent.update(series)
+
+
+def sketch_chunks(chunks, error=DEFAULT_ERROR):
+    """
+    Sketch every feature of a dataset that is read chunk by chunk
+
+    Parameters:
+        chunks (iterable): Dataframes with the same features
+        error (float): Error allowed in every statistic
+                       (Default: DEFAULT_ERROR)
+
+    Returns:
+        dict: ColumnSketch of every feature
+    """
+
+    sketches = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            if(col not in sketches):
+                numeric = pd.api.types.is_numeric_dtype(chunk[col].dtype)
+                sketches[col] = ColumnSketch(error, numeric)
+            sketches[col].update(chunk[col])
+    return sketches
+
@@ -0,0 +1,453 @@
+"""
+Module Store Data
+=================
+This module is concerned with storing the datasets of a project in its
+directory tree(data/raw, data/clean and data/processed) and reading them back
+
+Parquet and Feather keep dtypes intact, are compressed and let a reader load
+only the columns it needs. CSV is still available for anybody who wants to
+open the files in a spreadsheet.
+"""
+
+import os
+import gzip
+import time
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+# parquet and feather need pyarrow; it is slow to import, so it is only
+# looked for here and imported where it is used
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# file extension of every supported format
+FORMATS = {
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'csv': '.csv',
+}
+
+# compression used when none is asked for
+DEFAULT_COMPRESSION = {
+    'parquet': 'snappy',
+    'feather': 'lz4',
+    'csv': None,
+}
+
+# compression codecs every format can be written with
+COMPRESSIONS = {
+    'parquet': ('snappy', 'gzip', 'zstd', 'none'),
+    'feather': ('lz4', 'zstd', 'uncompressed'),
+    'csv': (None, 'gzip'),
+}
+
+DEFAULT_FORMAT = 'parquet' if HAS_PYARROW else 'csv'
+
+
+class DataStore:
+    """
+    Writes dataframes into and reads them out of the project directory in a
+    chosen storage format
+
+    Attributes:
+        fmt (str): Storage format, one of 'parquet', 'feather' or 'csv'
+        compression (str): Compression codec used while writing
+    """
+
+    def __init__(self, fmt=None, compression=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            fmt (str): Storage format, one of 'parquet', 'feather' or 'csv'
+                       (Default: parquet if pyarrow is installed, else csv)
+            compression (str): Compression codec used while writing; see
+                               COMPRESSIONS for the codecs of every format
+                               (Default: snappy for parquet, lz4 for feather
+                               and none for csv)
+        """
+
+        if(fmt is None):
+            fmt = DEFAULT_FORMAT
+        if(fmt not in FORMATS):
+            raise ValueError("Unknown storage format '" + str(fmt) + "'. "
+                             "Choose one of " + ', '.join(FORMATS))
+        if((fmt!='csv') and (not HAS_PYARROW)):
+            raise ImportError("The " + fmt + " format needs pyarrow. Install "
+                              "it with 'pip install pyarrow' or use csv.")
+
+        self.fmt = fmt
+        if(compression is None):
+            compression = DEFAULT_COMPRESSION[fmt]
+        if(compression not in COMPRESSIONS[fmt]):
+            raise ValueError("The " + fmt + " format cannot be compressed "
+                             "with '" + str(compression) + "'. Choose one of "
+                             + ', '.join(str(c) for c in COMPRESSIONS[fmt]))
+        self.compression = compression
+
+    def extension(self, fmt=None):
+        """
+        File extension of a storage format
+
+        Parameters:
+            fmt (str): Storage format (Default: the format of the store)
+
+        Returns:
+            str: The file extension
+        """
+
+        fmt = fmt or self.fmt
+        ext = FORMATS[fmt]
+        if((fmt=='csv') and (self.fmt=='csv') and (self.compression=='gzip')):
+            ext += '.gz'
+        return ext
+
+    def path(self, directory, name, fmt=None):
+        """
+        Path of a dataset in the store
+
+        Parameters:
+            directory (str): Directory of the dataset
+            name (str): Name of the dataset without extension
+            fmt (str): Storage format (Default: the format of the store)
+
+        Returns:
+            str: Path to the file
+        """
+
+        return (os.path.join(directory, name + self.extension(fmt)))
+
+    def write(self, df, directory, name):
+        """
+        Write a dataframe into the store
+
+        Columns that pyarrow cannot type(for example an object column holding
+        both numbers and strings) make the dataset fall back to csv. Sparse
+        columns are stored dense.
+
+        Parameters:
+            df (pandas dataframe): The dataframe to be stored
+            directory (str): Directory to store the dataset in
+            name (str): Name of the dataset without extension
+
+        Returns:
+            str: Path of the written file
+        """
+
+        from dataswissknife.encode_data import densify
+        df = densify(df)
+
+        if(self.fmt!='csv'):
+            import pyarrow
+            from pyarrow import feather
+            path = self.path(directory, name)
+            try:
+                if(self.fmt=='parquet'):
+                    df.to_parquet(path, compression=self.compression,
+                                  index=False)
+                else:
+                    feather.write_feather(df.reset_index(drop=True), path,
+                                          compression=self.compression)
+                return path
+            except (pyarrow.ArrowException, ValueError, TypeError) as e:
+                if(os.path.exists(path)):
+                    os.remove(path)
+                print("Could not store", name, "as", self.fmt, "(" + str(e) +
+                      "). Storing it as csv instead.")
+
+        path = self.path(directory, name, 'csv')
+        df.to_csv(path, index=False, compression=(self.compression if
+                                                  self.fmt=='csv' else None))
+        return path
+
+    def write_all(self, frames, directory, max_workers=None, verbose=True):
+        """
+        Write several dataframes into the store at the same time
+
+        Parameters:
+            frames (dict): Dataframes to be stored, by dataset name
+            directory (str): Directory to store the datasets in
+            max_workers (int): Number of writer threads
+                               (Default: one per dataset)
+            verbose (bool): Display the write report (Default: True)
+
+        Returns:
+            pandas dataframe: Bytes written and throughput per dataset
+        """
+
+        writer = BulkWriter(self, max_workers)
+        return (writer.write_all(frames, directory, verbose))
+
+    def locate(self, directory, name):
+        """
+        Find the file of a dataset, whichever format it was stored in
+
+        Parameters:
+            directory (str): Directory of the dataset
+            name (str): Name of the dataset without extension
+
+        Returns:
+            (str, str): Path of the file and its format
+        """
+
+        candidates = [self.fmt] + [f for f in FORMATS if f!=self.fmt]
+        for fmt in candidates:
+            path = self.path(directory, name, fmt)
+            if(os.path.exists(path)):
+                return (path, fmt)
+
+        raise FileNotFoundError("No stored dataset called '" + name +
+                                "' in " + directory)
+
+    def read(self, directory, name, columns=None):
+        """
+        Read a dataset back from the store
+
+        Parameters:
+            directory (str): Directory of the dataset
+            name (str): Name of the dataset without extension
+            columns (list): Only read these columns (Default: all columns)
+
+        Returns:
+            pandas dataframe: The stored dataframe
+        """
+
+        path, fmt = self.locate(directory, name)
+
+        if(fmt=='parquet'):
+            return (pd.read_parquet(path, columns=columns))
+        elif(fmt=='feather'):
+            from pyarrow import feather
+            return (feather.read_feather(path, columns=columns))
+        else:
+            return (pd.read_csv(path, usecols=columns))
+
+    def columns(self, directory, name):
+        """
+        List the features of a stored dataset without reading its rows
+
+        Parameters:
+            directory (str): Directory of the dataset
+            name (str): Name of the dataset without extension
+
+        Returns:
+            list: Names of the features
+        """
+
+        path, fmt = self.locate(directory, name)
+
+        if(fmt=='parquet'):
+            from pyarrow import parquet
+            return (parquet.read_schema(path).names)
+        elif(fmt=='feather'):
+            from pyarrow import ipc
+            return (ipc.open_file(path).schema.names)
+        else:
+            return (list(pd.read_csv(path, nrows=0).columns))
+
+    def export_csv(self, directory, name, dest_dir=None):
+        """
+        Export a stored dataset as a .csv file
+
+        Parameters:
+            directory (str): Directory of the dataset
+            name (str): Name of the dataset without extension
+            dest_dir (str): Directory to export into (Default: directory)
+
+        Returns:
+            str: Path of the exported file
+        """
+
+        path = os.path.join(dest_dir or directory, name + ".csv")
+        self.read(directory, name).to_csv(path, index=False)
+        return path
+
+    def appender(self, directory, name):
+        """
+        Open a dataset in the store that is written chunk by chunk
+
+        Parameters:
+            directory (str): Directory to store the dataset in
+            name (str): Name of the dataset without extension
+
+        Returns:
+            DataAppender: Appender for the dataset
+        """
+
+        return (DataAppender(self, directory, name))
+
+
+class BulkWriter:
+    """
+    Serializes several datasets concurrently on a pool of threads. pyarrow
+    and the compressors release the GIL while they work, so the files are
+    really written in parallel without copying the dataframes into other
+    processes.
+
+    Attributes:
+        store (DataStore): The store that writes each dataset
+        max_workers (int): Number of writer threads
+    """
+
+    def __init__(self, store, max_workers=None):
+        """
+        Constructor for the class
+
+        Parameters:
+            store (DataStore): The store that writes each dataset
+            max_workers (int): Number of writer threads
+                               (Default: one per dataset)
+        """
+
+        self.store = store
+        self.max_workers = max_workers
+
+    def timed_write(self, df, directory, name):
+        """
+        Write one dataset and measure it
+
+        Parameters:
+            df (pandas dataframe): The dataframe to be stored
+            directory (str): Directory to store the dataset in
+            name (str): Name of the dataset without extension
+
+        Returns:
+            dict: Row of the write report
+        """
+
+        start = time.perf_counter()
+        path = self.store.write(df, directory, name)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(path) / 1024 ** 2
+
+        return {
+            'Dataset': os.path.basename(path),
+            'Rows': df.shape[0],
+            'Size (MB)': size,
+            'Time (s)': seconds,
+            'Throughput (MB/s)': size / seconds if seconds else 0,
+        }
+
+    def write_all(self, frames, directory, verbose=True):
+        """
+        Write several dataframes at the same time
+
+        Parameters:
+            frames (dict): Dataframes to be stored, by dataset name
+            directory (str): Directory to store the datasets in
+            verbose (bool): Display the write report (Default: True)
+
+        Returns:
+            pandas dataframe: Bytes written and throughput per dataset
+        """
+
+        workers = self.max_workers or max(len(frames), 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.timed_write, df, directory, name)
+                       for name, df in frames.items()]
+            report = pd.DataFrame([f.result() for f in futures])
+
+        if(verbose):
+            print("Datasets written to", directory)
+            print(report.to_markdown(index=False))
+            print()
+
+        return report
+
+
+class DataAppender:
+    """
+    Writes a dataset into the store one chunk of rows at a time, so that it
+    never has to be held in memory as a whole
+
+    Every chunk is cast to the schema of the first one(parquet and feather).
+    Features with no value in the first chunk are typed as text, the only
+    type every later value can be cast to. Feather files are written
+    uncompressed.
+
+    Attributes:
+        path (str): Path of the dataset being written
+        rows (int): Number of rows written so far
+    """
+
+    def __init__(self, store, directory, name):
+        """
+        Constructor for the class
+
+        Parameters:
+            store (DataStore): The store the dataset belongs to
+            directory (str): Directory to store the dataset in
+            name (str): Name of the dataset without extension
+        """
+
+        self.__fmt = store.fmt
+        self.__compression = store.compression
+        self.path = store.path(directory, name)
+        self.rows = 0
+        self.__writer = None   # open file or pyarrow writer
+        self.__schema = None   # schema of the first chunk
+
+    def append(self, df):
+        """
+        Append a chunk of rows to the dataset
+
+        Parameters:
+            df (pandas dataframe): The chunk
+        """
+
+        if(self.__fmt=='csv'):
+            if(self.__writer is None):
+                if(self.__compression=='gzip'):
+                    self.__writer = gzip.open(self.path, 'wt', newline='')
+                else:
+                    self.__writer = open(self.path, 'w', newline='')
+            df.to_csv(self.__writer, header=(self.rows==0), index=False)
+        else:
+            import pyarrow
+            from pyarrow import parquet, ipc
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if(self.__writer is None):
+                self.__schema = self.first_schema(table, df)
+                if(self.__fmt=='parquet'):
+                    self.__writer = parquet.ParquetWriter(
+                            self.path, self.__schema,
+                            compression=self.__compression)
+                else:
+                    self.__writer = ipc.new_file(self.path, self.__schema)
+            if(not table.schema.equals(self.__schema)):
+                table = table.cast(self.__schema)
+            self.__writer.write_table(table)
+
+        self.rows += df.shape[0]
+
+    def first_schema(self, table, df):
+        """
+        Schema of the dataset, from its first chunk
+
+        A feature that is empty in the first chunk gets a null(or, read
+        from csv, a float) type from arrow, which text further down could
+        not be cast to; it is typed as text instead.
+
+        Parameters:
+            table (pyarrow table): The first chunk, converted by arrow
+            df (pandas dataframe): The first chunk
+
+        Returns:
+            pyarrow schema: The schema of every chunk
+        """
+
+        import pyarrow
+
+        empty = set(df.columns[df.isna().all().to_numpy()])
+        schema = table.schema
+        for i, field in enumerate(schema):
+            if((field.name in empty) or pyarrow.types.is_null(field.type)):
+                schema = schema.set(i, field.with_type(pyarrow.string()))
+        return schema
+
+    def close(self):
+        """Finish writing the dataset"""
+
+        if(self.__writer is not None):
+            self.__writer.close()
+            self.__writer = None
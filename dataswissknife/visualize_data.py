@@ -20,6 +20,12 @@ import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from dataswissknife.column_profile import ColumnProfile
+
+# theme of the plots; it is set around every plot rather than with
+# plt.style.use, which would change the style of every plot in the process
+PLOT_STYLE = 'bmh'
+
 __all__ = [
   'main_code',
   'clean_data',
@@ -30,9 +36,6 @@ __all__ = [
   'log_tracker',
 ]
 
-from dataswissknife import preprocess_data as prd
-
-plt.style.use('bmh')
 
 class Initiator:
     """
@@ -82,6 +85,10 @@ class Initiator:
         self.output_loc = output_loc        
         self.plotsize = (8,6)         # default size of plots
         
+        # statistics of the features of train and test
+        self.train_profile = ColumnProfile(train_df)
+        self.test_profile = ColumnProfile(test_df)
+        
     def max_cardinality(self, feature):
         """
         Maximum cardinality of a given feature across train and test datasets
@@ -94,8 +101,8 @@ class Initiator:
             features
         """
         
-        tr_card = len(list(self.train_df[feature].unique()))
-        te_card = len(list(self.test_df[feature].unique()))
+        tr_card = self.train_profile.bind(self.train_df).cardinality(feature)
+        te_card = self.test_profile.bind(self.test_df).cardinality(feature)
         
         return (max(tr_card, te_card))
         
@@ -124,18 +131,19 @@ class TrainTestCompare(Initiator):
         descriptor features in train and test datasets
         """
         
-        for feat in self.numericals:
-            fig, axs = plt.subplots(1,1, figsize=(10,6))
-            sns.kdeplot(self.train_df[feat], color='green', label='Train Data', 
-                        shade=True, ax=axs)
-            sns.kdeplot(self.test_df[feat], color='red', label='Test Data', 
-                        shade=True, ax=axs)
-            # label and save the plot
-            fig.suptitle("Train-test distribution comparison of "+feat,
-                         fontsize=20)
-            figname = feat+'_train_test_compare.png'
-            plt.savefig(os.path.join(self.output_loc,figname))
-            #plt.show()
+        with plt.style.context(PLOT_STYLE):
+            for feat in self.numericals:
+                fig, axs = plt.subplots(1,1, figsize=(10,6))
+                sns.kdeplot(self.train_df[feat], color='green',
+                            label='Train Data', shade=True, ax=axs)
+                sns.kdeplot(self.test_df[feat], color='red',
+                            label='Test Data', shade=True, ax=axs)
+                # label and save the plot
+                fig.suptitle("Train-test distribution comparison of "+feat,
+                             fontsize=20)
+                figname = feat+'_train_test_compare.png'
+                plt.savefig(os.path.join(self.output_loc,figname))
+                #plt.show()
     
     def compare_non_numericals(self):
         """
@@ -145,24 +153,23 @@ class TrainTestCompare(Initiator):
         
         card_overload = []   # features that have a cardinality of 13 and above
         
-        for feat in self.non_numericals:
-            
-            try:
-                if(self.max_cardinality(feat)<13):
-                    fig, axs = plt.subplots(2,1, figsize=(20,10))
-                    sns.countplot(data=self.train_df, x=feat, ax=axs[0])
-                    sns.countplot(data=self.test_df, x=feat, ax=axs[1])
-                    # label and save the plot
-                    fig.suptitle("Train-test distribution comparison of "+feat,
-                                 fontsize=20)
-                    figname = feat+'_train_test_compare.png'
-                    plt.savefig(os.path.join(self.output_loc,figname))
-                    #plt.show()
-                else:
-                    card_overload.append(feat)
-                
-            except:
-                continue
+        with plt.style.context(PLOT_STYLE):
+            for feat in self.non_numericals:
+                try:
+                    if(self.max_cardinality(feat)<13):
+                        fig, axs = plt.subplots(2,1, figsize=(20,10))
+                        sns.countplot(data=self.train_df, x=feat, ax=axs[0])
+                        sns.countplot(data=self.test_df, x=feat, ax=axs[1])
+                        # label and save the plot
+                        fig.suptitle("Train-test distribution comparison of "
+                                     +feat, fontsize=20)
+                        figname = feat+'_train_test_compare.png'
+                        plt.savefig(os.path.join(self.output_loc,figname))
+                        #plt.show()
+                    else:
+                        card_overload.append(feat)
+                except:
+                    continue
         
         if(len(card_overload)!=0):
             print("The following features have cardinalities > 12 and hence have",
@@ -195,15 +202,16 @@ class RelWithLabels(Initiator):
         Plots box plots to compare numerical features
         """
         
-        for feat in self.numericals:
-            fig, axs = plt.subplots(1,1, figsize=(10,6))
-            sns.boxplot(data=self.train_df, x=self.target, y=feat)
-            # label and save the plot
-            fig.suptitle("Box plot of "+feat,
-                         fontsize=20)
-            figname = feat+'_box_with_labels.png'
-            plt.savefig(os.path.join(self.output_loc,figname))
-            #plt.show()
+        with plt.style.context(PLOT_STYLE):
+            for feat in self.numericals:
+                fig, axs = plt.subplots(1,1, figsize=(10,6))
+                sns.boxplot(data=self.train_df, x=self.target, y=feat)
+                # label and save the plot
+                fig.suptitle("Box plot of "+feat,
+                             fontsize=20)
+                figname = feat+'_box_with_labels.png'
+                plt.savefig(os.path.join(self.output_loc,figname))
+                #plt.show()
             
     
 class FinalPlotter(TrainTestCompare, RelWithLabels):
@@ -231,17 +239,18 @@ class FinalPlotter(TrainTestCompare, RelWithLabels):
         """
         Seaborn pairplot
         """
-        try:
-            # train data
-            sns.pairplot(self.train_df)
-            figname = 'train_pairplot.png'
-            plt.savefig(os.path.join(self.output_loc,figname))
-            # test data
-            sns.pairplot(self.test_df)
-            figname = 'test_pairplot.png'
-            plt.savefig(os.path.join(self.output_loc,figname))
-        except:
-            pass
+        with plt.style.context(PLOT_STYLE):
+            try:
+                # train data
+                sns.pairplot(self.train_df)
+                figname = 'train_pairplot.png'
+                plt.savefig(os.path.join(self.output_loc,figname))
+                # test data
+                sns.pairplot(self.test_df)
+                figname = 'test_pairplot.png'
+                plt.savefig(os.path.join(self.output_loc,figname))
+            except:
+                pass
     
     def plot_it_all(self):
         
@@ -22,7 +22,13 @@ setuptools.setup(
         'termcolor==1.1.0',
         'scikit_learn==0.23.1',
         'tabulate==0.8.7',
+        'pyarrow==0.17.1',
+        'scipy==1.4.1',
     ],
+    extras_require={
+        # .yaml answers files for `dsk --answers`; .json needs nothing extra
+        'yaml': ['pyyaml'],
+    },
     classifiers=[
         # classifiers will help PyPI find the package better
         "Development Status :: 3 - Alpha",
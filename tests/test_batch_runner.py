@@ -0,0 +1,46 @@
+"""
+Tests of the status a batch gives every dataset
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataswissknife import batch_runner as br
+
+SPEC = {'storage_format': 'csv', 'missing': [], 'consistency': 'n',
+        'optimize_memory': False, 'continue_preprocessing': False}
+
+
+def make_batch(directory):
+    """A dataset that loads and one that does not"""
+
+    rng = np.random.RandomState(0)
+    pd.DataFrame({'a': rng.rand(50), 'b': rng.randint(0, 5, 50)}).to_csv(
+            str(directory / "good.csv"), index=False)
+    (directory / "bad.csv").write_bytes(b'\x00\x01 not a csv "\n\x80\x81')
+    return [str(directory / "good.csv"), str(directory / "bad.csv")]
+
+
+def test_stop_as_configured_is_done_and_load_error_failed(tmp_path):
+    datasets = make_batch(tmp_path)
+    dest = tmp_path / "projects"
+    dest.mkdir()
+
+    good = br.run_project(datasets[0], "good", SPEC, str(dest))
+    bad = br.run_project(datasets[1], "bad", SPEC, str(dest))
+
+    assert good['Status'] == 'done'
+    assert good['Error'] == ''
+    assert bad['Status'] == 'failed'
+    assert 'code 1' in bad['Error']
+
+
+def test_batch_summary(tmp_path):
+    datasets = make_batch(tmp_path)
+
+    runner = br.BatchRunner(datasets, SPEC, str(tmp_path / "projects"),
+                            max_workers=2)
+    summary = runner.run(verbose=False)
+
+    assert dict(zip(summary['Dataset'], summary['Status'])) == \
+        {'good.csv': 'done', 'bad.csv': 'failed'}
@@ -0,0 +1,66 @@
+"""
+Tests of cleaning plans saved, loaded and replayed on new data
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataswissknife import clean_data as cd
+
+
+def test_plan_keeps_the_types_of_learned_values(tmp_path):
+    values = {'seen': pd.Timestamp('2020-01-02 03:04:05', tz='UTC'),
+              'day': np.datetime64('2021-05-06'),
+              'wait': pd.Timedelta('1 days 2 hours'),
+              'count': np.int64(3),
+              'town': 'Oslo'}
+    path = str(tmp_path / "plan.json")
+    cd.CleaningPlan([{'op': 'impute', 'params': values}]).save(path)
+
+    loaded = cd.CleaningPlan.load(path).steps[0]['params']
+
+    assert loaded['seen'] == values['seen']
+    assert loaded['day'] == pd.Timestamp('2021-05-06')
+    assert loaded['wait'] == values['wait']
+    assert loaded['count'] == 3
+    assert loaded['town'] == 'Oslo'
+
+
+def test_replay_leaves_the_new_data_alone():
+    plan = cd.CleaningPlan([
+        {'op': 'strip', 'params': ['town']},
+        {'op': 'strip_symbols', 'params': {'fare': ['$']}},
+        {'op': 'round', 'params': {'columns': ['fare'], 'decimals': 0}},
+        {'op': 'impute', 'params': {'seen': pd.Timestamp('2020-01-02')}},
+    ])
+    df = pd.DataFrame({'town': [' Oslo ', 'Lima '],
+                       'fare': ['$1.4', '$2.6'],
+                       'seen': pd.to_datetime(['2020-01-01', None])})
+    before = df.copy()
+
+    cleaned = plan.replay(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert cleaned['town'].tolist() == ['Oslo', 'Lima']
+    assert cleaned['fare'].tolist() == [1.0, 3.0]
+    assert cleaned['seen'].tolist() == [pd.Timestamp('2020-01-01'),
+                                        pd.Timestamp('2020-01-02')]
+
+
+def test_auto_consistency_keeps_signs_and_exponents():
+    from dataswissknife.answers import Answers
+
+    df = pd.DataFrame({'amount': ['-5', '1e5', '$3', '4%', '1,200', '-2.5e-1'],
+                       'town': ['Oslo', 'Lima', 'Oslo', 'Lima', 'Rome',
+                                'Oslo']})
+    dc = cd.DataCleaner(df, Answers({'missing': [], 'consistency': 'auto'},
+                                    interactive=False))
+    dc.clean_df()
+
+    assert dc.df['amount'].tolist() == [-5.0, 1e5, 3.0, 4.0, 1200.0, -0.25]
+    assert dc.df['town'].tolist() == ['Oslo', 'Lima', 'Oslo', 'Lima', 'Rome',
+                                      'Oslo']
+
+    # the plan converts new data the same way
+    replayed = dc.plan.replay(df)
+    assert replayed['amount'].tolist() == dc.df['amount'].tolist()
@@ -0,0 +1,70 @@
+"""
+Stress test of many cleaners and preprocessors running at once in threads of
+one process; each must keep its own state
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dataswissknife import clean_data as cd
+from dataswissknife import preprocess_data as prd
+from dataswissknife.answers import Answers
+
+DATASETS = 24
+WORKERS = 12
+ROWS = 400
+
+
+def make_frame(i):
+    """A dataset whose own features are named after it"""
+
+    rng = np.random.RandomState(i)
+    df = pd.DataFrame({'Age': rng.normal(40, 10, ROWS),
+                       'y': rng.choice(['p', 'q'], ROWS)})
+    # features named after the dataset, so leaked state would show
+    df['F%d' % i] = ['$%d' % v for v in rng.randint(1, 50, ROWS)]
+    df['C%d' % i] = rng.choice(['a', 'b', 'c'], ROWS)
+    df.loc[::7, 'Age'] = np.nan
+    return df
+
+
+def run(i):
+    """Clean and preprocess a dataset; returns what it learned"""
+
+    answers = Answers({'missing': ['impute'],
+                       'imputation': {'age': 'median'},
+                       'consistency': 'auto',
+                       'target': 'y',
+                       'ordinal': {'c%d' % i: ['a', 'b', 'c']},
+                       'scale': True,
+                       'remove_outliers': []}, interactive=False)
+
+    dc = cd.DataCleaner(make_frame(i), answers)
+    dc.clean_df()
+    df = dc.df
+
+    train, test = df.iloc[:300], df.iloc[300:]
+    pp = prd.PreProcessor(train.copy(), test.drop(columns='y'), test[['y']],
+                          'y', answers)
+    X, _, _ = pp.give_output()
+    return (sorted(df.columns), sorted(pp.ratio), sorted(pp.ordinal),
+            sorted(pp.nominal), sorted(pp.order_dict),
+            X.round(6).to_csv())
+
+
+def test_cleaners_and_preprocessors_in_threads():
+    sequential = [run(i) for i in range(DATASETS)]
+    with ThreadPoolExecutor(WORKERS) as pool:
+        parallel = list(pool.map(run, list(range(DATASETS)) * 2))
+
+    for i, result in enumerate(sequential):
+        columns, ratio, ordinal, nominal, orders, _ = result
+        assert columns == ['age', 'c%d' % i, 'f%d' % i, 'y']
+        assert ratio == ['age', 'f%d' % i]
+        assert ordinal == ['c%d' % i]
+        assert nominal == []
+        assert orders == ['c%d' % i]
+
+    assert parallel == sequential * 2
@@ -0,0 +1,45 @@
+"""
+Tests of duplicate rows removed in memory and out of core
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataswissknife import dedupe_data as dd
+from dataswissknife import store_data as sd
+
+
+def make_frame():
+    """A dataframe with duplicate rows, some with missing values"""
+
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({'a': rng.randint(0, 5, 500).astype(float),
+                       'b': rng.choice(['x', 'y', None], 500)})
+    return pd.concat([df, df.iloc[:50]], ignore_index=True)
+
+
+def test_in_memory_dedupe_keeps_first_rows():
+    df = make_frame()
+
+    deduped, removed = dd.drop_duplicate_rows(df)
+
+    pd.testing.assert_frame_equal(deduped, df.drop_duplicates())
+    assert removed == df.shape[0] - deduped.shape[0]
+
+
+def test_out_of_core_dedupe_matches_in_memory(tmp_path):
+    pytest.importorskip("pyarrow")
+    datapath = str(tmp_path / "data.csv")
+    make_frame().to_csv(datapath, index=False)
+    df = pd.read_csv(datapath)
+    store = sd.DataStore('parquet')
+
+    dedupe = dd.OutOfCoreDeduplicator(datapath, store=store, chunksize=64,
+                                      partitions=8)
+    dedupe.deduplicate(str(tmp_path), "deduped")
+
+    deduped = store.read(str(tmp_path), "deduped")
+    expected = df.drop_duplicates().reset_index(drop=True)
+    assert dedupe.duplicates == df.shape[0] - expected.shape[0]
+    pd.testing.assert_frame_equal(deduped, expected, check_dtype=False)
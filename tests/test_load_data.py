@@ -0,0 +1,44 @@
+"""
+Tests of datasets loaded in chunks and optimized chunk by chunk
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataswissknife import load_data as ld
+
+ROWS = 1000
+
+
+def make_csv(path):
+    """Write a dataset whose town is missing in its first rows"""
+
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({'count': rng.randint(0, 100, ROWS),
+                       'amount': rng.randint(0, 10 ** 6, ROWS),
+                       'town': rng.choice(['Oslo', 'Lima', 'Paris'], ROWS)})
+    df['town'] = df['town'].astype(object)
+    df.loc[:299, 'town'] = None
+    df.loc[800:, 'count'] = None
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def test_optimized_chunks_join_into_compact_dataframe(tmp_path):
+    datapath = str(tmp_path / "data.csv")
+    raw = make_csv(datapath)
+
+    optimizer = ld.MemoryOptimizer()
+    loader = ld.ChunkLoader(datapath, chunksize=100, sample_rows=100)
+    df = loader.load_dataframe(optimizer)
+
+    assert df.shape == raw.shape
+    assert isinstance(df['town'].dtype, pd.CategoricalDtype)
+    assert sorted(df['town'].cat.categories) == ['Lima', 'Oslo', 'Paris']
+    assert df['amount'].dtype == np.uint32
+    assert optimizer.schema['count'] == 'float64'
+    assert optimizer.schema['amount'] == 'int64'
+
+    restored = optimizer.restore(df)
+    assert optimizer.check(restored) == {}
+    pd.testing.assert_frame_equal(restored, raw, check_dtype=False)
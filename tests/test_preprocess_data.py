@@ -0,0 +1,50 @@
+"""
+Tests of identifier features and outliers found while preprocessing
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataswissknife import preprocess_data as prd
+from dataswissknife.answers import Answers
+
+ROWS = 2000
+
+
+def test_only_unique_features_are_dropped_as_identifiers():
+    rng = np.random.RandomState(0)
+    near = np.arange(ROWS)
+    near[:10] = 0     # 99.5% unique
+    df = pd.DataFrame({'id': np.arange(ROWS), 'near': near,
+                       'x': rng.rand(ROWS).round(2),
+                       'y': rng.choice(['p', 'q'], ROWS)})
+    answers = Answers({'drop_features': []}, interactive=False)
+
+    pp = prd.PreProcessor(df, df.drop(columns='y').copy(), df[['y']], 'y',
+                          answers)
+    pp.prompt_id_removal()
+
+    assert list(pp.X.columns) == ['near', 'x']
+    assert list(pp.df_test.columns) == ['near', 'x']
+
+
+def test_mad_outliers_of_tied_features():
+    rng = np.random.RandomState(0)
+    # most values are 0, so the median absolute deviation is 0 too
+    spend = np.zeros(ROWS)
+    spend[:300] = rng.gamma(2, 10, 300)
+    spend[0] = 10000
+    df = pd.DataFrame({'spend': spend, 'flag': np.ones(ROWS),
+                       'y': rng.choice(['p', 'q'], ROWS)})
+    answers = Answers({}, interactive=False)
+
+    pp = prd.PreProcessor(df, df.drop(columns='y').copy(), df[['y']], 'y',
+                          answers)
+    report = pp.filter_outliers(['spend', 'flag'], 'mad')
+
+    # only the extreme value goes, not every row that differs from 0
+    assert pp.X.shape[0] > ROWS - 100
+    assert 10000 not in pp.X['spend'].tolist()
+    assert report.loc['flag', 'Outliers'] == 0
+    assert report.loc['spend', 'Note'].startswith("MAD is 0")
+    assert report.loc['flag', 'Note'] == "No spread; skipped"
@@ -0,0 +1,60 @@
+"""
+Tests of the sketches fed chunk by chunk
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataswissknife import load_data as ld
+from dataswissknife import sketch_data as sk
+
+
+@pytest.mark.parametrize("error", [0.26, 0.18, 0.13])
+def test_small_hyperloglogs_are_unbiased(error):
+    rng = np.random.RandomState(0)
+    values = pd.Series(rng.randint(0, 50000, 200000))
+    exact = values.nunique()
+
+    counts = []
+    for seed in range(20):
+        hll = sk.HyperLogLog(error)
+        hll.update(values + seed * 10 ** 6)
+        counts.append(hll.count())
+
+    # the mean of many estimates has no bias left for small registers
+    assert abs(np.mean(counts) / exact - 1) < 3 * hll.error / np.sqrt(20)
+
+
+def test_hyperloglog_chunks_and_merges_agree():
+    rng = np.random.RandomState(1)
+    values = pd.Series(rng.randint(0, 10000, 50000))
+
+    whole = sk.HyperLogLog()
+    whole.update(values)
+    chunked = sk.HyperLogLog()
+    for start in range(0, values.shape[0], 7000):
+        chunked.update(values.iloc[start:start + 7000])
+    merged = sk.HyperLogLog()
+    other = sk.HyperLogLog()
+    merged.update(values.iloc[:20000])
+    other.update(values.iloc[20000:])
+    merged.merge(other)
+
+    assert whole.count() == chunked.count() == merged.count()
+
+
+def test_chunk_loader_sketches_a_file(tmp_path):
+    rng = np.random.RandomState(2)
+    df = pd.DataFrame({'x': rng.rand(20000), 'c': rng.choice(['a', 'b'],
+                                                             20000)})
+    df.loc[:1000, 'c'] = 'z'
+    datapath = str(tmp_path / "data.csv")
+    df.to_csv(datapath, index=False)
+
+    sketches = ld.ChunkLoader(datapath, chunksize=3000).sketch(0.01)
+
+    assert abs(sketches['x'].quantiles.median() - df['x'].median()) < 0.02
+    assert sketches['c'].frequent.mode() == df['c'].mode()[0]
+    assert sketches['c'].distinct.count() == 3
+    assert sketches['x'].rows == 20000
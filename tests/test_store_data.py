@@ -0,0 +1,83 @@
+"""
+Tests of datasets written chunk by chunk whose first chunk has a feature
+with no value
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataswissknife import dedupe_data as dd
+from dataswissknife import load_data as ld
+from dataswissknife import store_data as sd
+
+pytest.importorskip("pyarrow")
+
+ROWS = 1000
+EMPTY_ROWS = 300  # rows at the start without a city
+
+
+def make_csv(path):
+    """Write a dataset whose city is missing in its first rows"""
+
+    rng = np.random.RandomState(0)
+    city = rng.choice(['Paris', 'Oslo', 'Lima'], ROWS).astype(object)
+    city[:EMPTY_ROWS] = None
+    df = pd.DataFrame({'id': np.arange(ROWS),
+                       'city': city,
+                       'y': rng.randint(0, 2, ROWS)})
+    # a few duplicate rows after the empty ones
+    df = pd.concat([df, df.iloc[EMPTY_ROWS:EMPTY_ROWS + 10]],
+                   ignore_index=True)
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather'])
+def test_appender_types_empty_feature_as_text(tmp_path, fmt):
+    store = sd.DataStore(fmt)
+    appender = store.appender(str(tmp_path), "data")
+    try:
+        appender.append(pd.DataFrame({'a': [1, 2], 'b': [None, None]}))
+        appender.append(pd.DataFrame({'a': [3, 4], 'b': ['x', None]}))
+    finally:
+        appender.close()
+
+    df = store.read(str(tmp_path), "data")
+    assert df.shape == (4, 2)
+    assert df['b'].isna().tolist() == [True, True, False, True]
+    assert df.loc[2, 'b'] == 'x'
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather'])
+def test_streaming_split_with_empty_first_chunk(tmp_path, fmt):
+    datapath = str(tmp_path / "data.csv")
+    df = make_csv(datapath)
+    store = sd.DataStore(fmt)
+
+    splitter = ld.StreamingSplitter(datapath, str(tmp_path), store=store,
+                                    chunksize=100)
+    n_train, n_test = splitter.train_test_split('y')
+
+    assert n_train + n_test == df.shape[0]
+    train = store.read(str(tmp_path), "train")
+    test = store.read(str(tmp_path), "test")
+    cities = pd.concat([train['city'], test['city']])
+    assert cities.notna().sum() == df['city'].notna().sum()
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather'])
+def test_out_of_core_dedupe_with_empty_first_chunk(tmp_path, fmt):
+    datapath = str(tmp_path / "data.csv")
+    df = make_csv(datapath)
+    store = sd.DataStore(fmt)
+
+    dedupe = dd.OutOfCoreDeduplicator(datapath, store=store, chunksize=100,
+                                      partitions=4)
+    dedupe.deduplicate(str(tmp_path), "deduped")
+
+    assert dedupe.duplicates == 10
+    deduped = store.read(str(tmp_path), "deduped")
+    assert deduped.shape[0] == ROWS
+    assert deduped['city'].tolist()[EMPTY_ROWS:] == \
+        df['city'].tolist()[EMPTY_ROWS:ROWS]
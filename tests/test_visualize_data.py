@@ -0,0 +1,34 @@
+"""
+Tests of the plots generated for a dataset
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+from dataswissknife import visualize_data as vd
+
+
+def test_plots_leave_the_global_style_alone(tmp_path):
+    import matplotlib.pyplot as plt
+
+    rng = np.random.RandomState(0)
+    train = pd.DataFrame({'x': rng.rand(60), 'c': rng.choice(['a', 'b'], 60),
+                          'y': rng.choice(['p', 'q'], 60)})
+    test = train.drop(columns='y').iloc[:20]
+    features = (['x'], ['c'], ['x'], [], ['c'], [], None)
+    before = dict(plt.rcParams)
+
+    plotter = vd.FinalPlotter(train, test, 'y', features, str(tmp_path))
+    plotter.compare_non_numericals()
+    plotter.box_comp()
+    plt.close('all')
+
+    assert dict(plt.rcParams) == before
+    assert os.path.exists(str(tmp_path / "c_train_test_compare.png"))
+    assert os.path.exists(str(tmp_path / "x_box_with_labels.png"))